@@ -2,19 +2,28 @@
 Book generation API endpoints.
 """
 
+import json
 import logging
+import os
 import threading
+import time
 import uuid
-from datetime import timedelta
-from flask import request, jsonify, g
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import request, jsonify, g, Response, stream_with_context
+from typing import Dict, Any, Tuple
 
 from api import api_bp
 from lib.auth import require_auth, optional_auth, status_auth, get_current_user_id, auth_service
-from lib.validation import validate_book_generation_request
+from lib.validation import validate_book_generation_request, UUID_PATTERN
 from lib.database_service import get_database_service, DatabaseError
 from lib.user_profile_service import get_profile_service, ProfileError
-from utils.datetime_utils import utc_now_iso, utc_now, format_for_database
+from lib.task_queue import get_task_queue, TaskQueueError
+from lib.progress_writer import ProgressWriter
+from lib.generation_status_store import get_generation_status_store
+from lib.single_flight import get_single_flight
+from lib.supabase_storage import get_storage_service, SupabaseStorageError, BOOK_FILE_NAMES
+from utils.datetime_utils import utc_now_ns, iso_from_ns, format_for_database
+from utils.lazy_init import LazyInstance
 from models.book_models import BookData
 from services.outline_generator_service import OutlineGeneratorService
 from services.chapter_generator_service import ChapterGeneratorService
@@ -25,19 +34,63 @@ from services.metadata_generator_service import MetadataGeneratorService
 
 logger = logging.getLogger(__name__)
 
-# Global storage for generation status (in production, use Redis or database)
-generation_status = {}
+# Generation services are only needed by the background job, so they are
+# constructed on first use instead of at import in every web worker
+outline_service = LazyInstance(OutlineGeneratorService)
+chapter_service = LazyInstance(ChapterGeneratorService)
+pdf_service = LazyInstance(PDFGeneratorService)
+epub_service = LazyInstance(EPUBGeneratorService)
+metadata_service = LazyInstance(MetadataGeneratorService)
+storage_service = LazyInstance(get_storage_service)
 
-# Initialize services
-outline_service = OutlineGeneratorService()
-chapter_service = ChapterGeneratorService()
-pdf_service = PDFGeneratorService()
-epub_service = EPUBGeneratorService()
-metadata_service = MetadataGeneratorService()
+# Database and profile services are resolved on first use rather than at import,
+# so importing the API does not open Supabase clients
+db_service = LazyInstance(get_database_service)
+profile_service = LazyInstance(get_profile_service)
 
-# Initialize database and profile services
-db_service = get_database_service()
-profile_service = get_profile_service()
+# Background job queue (RQ worker pool when REDIS_URL is set)
+task_queue = get_task_queue()
+
+# Generation status shared between web and worker processes (Redis when REDIS_URL is set)
+status_store = get_generation_status_store()
+
+# Minimum seconds between progress writes to the database for a single book.
+# Live progress is always served from the status store; terminal states are
+# written immediately by _generate_book_async. When the store is shared, the
+# database row only backs the dashboard list, so it is refreshed less often.
+PROGRESS_FLUSH_INTERVAL = 30.0 if status_store.is_shared else 2.0
+_last_progress_flush: Dict[str, Tuple[float, str]] = {}
+
+
+def _write_book_fields(book_id: str, fields: Dict[str, Any]) -> None:
+    """Update a book's row using the service client (bypasses RLS for background operations)."""
+    db_service().service_client.table('books').update(fields).eq('id', book_id).execute()
+
+
+# Progress writes happen off the generation thread; terminal writes go through
+# write_now() so a queued progress update can never overwrite them
+progress_writer = ProgressWriter(_write_book_fields)
+
+# ReportLab keeps module-level state, so the book PDF and the metadata PDF are
+# rendered one at a time even though the file generation steps run in parallel
+_reportlab_lock = threading.Lock()
+
+# Identical (title, author, book_type) generations share one pipeline run;
+# waiting jobs copy the owner's files once it completes
+single_flight = get_single_flight()
+
+# A waiter whose owner fails falls back to generating the book itself, so the
+# wait must leave a full generation's time inside the job timeout
+BOOK_GENERATION_BUDGET_SECONDS = int(os.getenv('BOOK_GENERATION_BUDGET_SECONDS', '900'))
+SINGLE_FLIGHT_WAIT_SECONDS = min(
+    single_flight.lock_ttl,
+    task_queue.job_timeout_seconds - BOOK_GENERATION_BUDGET_SECONDS
+)
+SHARED_BOOK_FILES = {f'{file_type}_url': filename for file_type, filename in BOOK_FILE_NAMES.items()}
+
+# Maximum lifetime of a single status event stream; keep it below the gunicorn
+# worker timeout (EventSource clients reconnect automatically)
+STATUS_STREAM_MAX_SECONDS = int(os.getenv('STATUS_STREAM_MAX_SECONDS', '240'))
 
 
 @api_bp.route('/generate-book', methods=['POST'])
@@ -72,8 +125,7 @@ def generate_book():
         # Get anonymous user ID from request if user is not authenticated
         anonymous_user_id = None
         if not user_id:
-            data = request.get_json()
-            anonymous_user_id = data.get('anonymous_user_id')
+            anonymous_user_id = g.validated_data['anonymous_user_id']
             if not anonymous_user_id:
                 return jsonify({
                     'success': False,
@@ -83,33 +135,21 @@ def generate_book():
                 }), 400
         
         # Check generation limits before proceeding
+        limit_check = None
         try:
-            limit_check = profile_service.check_generation_limit(
+            limit_check = profile_service().check_generation_limit(
                 user_id=user_id, 
                 anonymous_user_id=anonymous_user_id,
                 jwt_token=jwt_token
             )
             
-            if not limit_check['allowed']:
-                error_message = "Generation limit exceeded"
-                code = 'GENERATION_LIMIT_EXCEEDED'
-                
-                if limit_check['user_type'] == 'anonymous':
-                    error_message = "You have reached the limit of 1 book for anonymous users. Please sign in to continue."
-                    code = 'ANONYMOUS_LIMIT_EXCEEDED'
-                elif limit_check['subscription_status'] == 'free':
-                    error_message = f"You have reached your lifetime limit of {limit_check['limit_value']} book for free accounts. Please upgrade to Pro to generate more books."
-                    code = 'FREE_LIMIT_EXCEEDED'
-                elif limit_check['subscription_status'] == 'pro':
-                    error_message = f"You have reached your daily limit of {limit_check['limit_value']} books. Please try again tomorrow."
-                    code = 'DAILY_LIMIT_EXCEEDED'
-                
-                return jsonify({
-                    'success': False,
-                    'error': error_message,
-                    'code': code,
-                    'limit_info': limit_check
-                }), 429
+            # Reserve the generation atomically so concurrent requests cannot all pass the check
+            if not limit_check['allowed'] or not profile_service().try_consume_quota(
+                limit_check,
+                user_id=user_id,
+                anonymous_user_id=anonymous_user_id
+            ):
+                return _limit_exceeded_response(limit_check)
                 
         except ProfileError as e:
             logger.warning(f"Could not check generation limit: {str(e)}")
@@ -131,8 +171,12 @@ def generate_book():
         # Generate unique book ID
         book_id = str(uuid.uuid4())
         
+        # Read the clock once; the status record and the database share this timestamp
+        now_ns = utc_now_ns()
+        created_at = iso_from_ns(now_ns)
+        
         # Initialize generation status
-        generation_status[book_id] = {
+        status_store.create(book_id, {
             'book_id': book_id,
             'user_id': user_id,
             'anonymous_user_id': anonymous_user_id,
@@ -142,17 +186,18 @@ def generate_book():
             'status': 'pending',
             'progress': 0,
             'current_step': 'Starting book generation...',
-            'created_at': utc_now_iso(),
-            'updated_at': utc_now_iso(),
+            'created_at': created_at,
+            'updated_at_ns': now_ns,
             'error': None,
             'files': {
                 'pdf_url': None,
                 'epub_url': None,
                 'metadata_url': None
             }
-        }
+        })
         
-        # Create initial book record in database
+        # Create initial book record in database. Anonymous limits count these
+        # rows, so the row must exist before the request returns.
         try:
             book_data = {
                 'id': book_id,
@@ -164,12 +209,13 @@ def generate_book():
                 'status': 'pending',
                 'progress': 0,
                 'total_chapters': 15,
-                'created_at': format_for_database()
+                'created_at': created_at
             }
-            db_service.create_book(book_data)
+            db_service().create_book(book_data)
             logger.info(f"Created book record in database: {book_id} for {'user ' + user_id if user_id else 'anonymous user ' + anonymous_user_id}")
         except DatabaseError as e:
             logger.error(f"Failed to create book record in database: {str(e)}")
+            _abandon_generation(book_id, limit_check, user_id, anonymous_user_id)
             return jsonify({
                 'success': False,
                 'error': 'Failed to create book record',
@@ -177,22 +223,41 @@ def generate_book():
                 'message': str(e)
             }), 500
         
-        # Increment book count
+        # Hand book generation to the background worker pool (no JWT needed for background process)
+        try:
+            task_queue.enqueue(
+                _generate_book_async,
+                book_id, user_id, anonymous_user_id, title, author, book_type,
+                job_id=book_id
+            )
+        except TaskQueueError as e:
+            logger.error(f"Failed to queue book generation for {book_id}: {str(e)}")
+            
+            # The job never ran: drop its row so it doesn't count against anonymous limits
+            try:
+                db_service().service_client.table('books').delete(returning='minimal').eq('id', book_id).execute()
+            except Exception as delete_error:
+                logger.error(f"Failed to remove book record {book_id} after queue error: {str(delete_error)}")
+            _abandon_generation(book_id, limit_check, user_id, anonymous_user_id)
+            
+            return jsonify({
+                'success': False,
+                'error': 'Failed to queue book generation',
+                'code': 'QUEUE_ERROR',
+                'message': str(e)
+            }), 503
+        
+        # Count the book only once its job is queued
         try:
             if user_id:
                 # Authenticated user - increment both daily and total counts
-                profile_service.increment_total_book_count(user_id, jwt_token=jwt_token)
+                profile_service().increment_total_book_count(user_id, jwt_token=jwt_token)
             # For anonymous users, the count is tracked by the database query itself
         except ProfileError as e:
             logger.warning(f"Could not increment book count: {str(e)}")
         
-        # Start book generation in background thread (no JWT needed for background process)
-        thread = threading.Thread(
-            target=_generate_book_async,
-            args=(book_id, user_id, anonymous_user_id, title, author, book_type)
-        )
-        thread.daemon = True
-        thread.start()
+        # Counts changed, so the next limit check must go to the database
+        profile_service().invalidate_generation_limit(user_id=user_id, anonymous_user_id=anonymous_user_id)
         
         logger.info(f"Started book generation for {'user ' + user_id if user_id else 'anonymous user ' + anonymous_user_id}: '{title}' (book_id: {book_id})")
         
@@ -240,50 +305,49 @@ def get_book_status(book_id: str):
                     'code': 'ANONYMOUS_ID_REQUIRED'
                 }), 400
         
-        # First check in-memory status (for active generations)
-        if book_id in generation_status:
-            status = generation_status[book_id]
-            
+        # Malformed IDs can never match, so skip the Redis and database lookups
+        if not UUID_PATTERN.match(book_id):
+            return jsonify({
+                'success': False,
+                'error': 'Book not found',
+                'code': 'BOOK_NOT_FOUND'
+            }), 404
+        
+        # First check live status (for active generations)
+        status = status_store.get(book_id)
+        if status:
             # Check if user owns this book
-            if user_id and status['user_id'] != user_id:
+            if not _owns_status(status, user_id, anonymous_user_id):
                 return jsonify({
                     'success': False,
                     'error': 'Access denied',
                     'code': 'ACCESS_DENIED'
                 }), 403
-            elif anonymous_user_id and status['anonymous_user_id'] != anonymous_user_id:
-                return jsonify({
-                    'success': False,
-                    'error': 'Access denied',
-                    'code': 'ACCESS_DENIED'
-                }), 403
-            
-            # Return status information
-            response_data = {
-                'success': True,
-                'book_id': book_id,
-                'status': status['status'],
-                'progress': status['progress'],
-                'current_step': status['current_step'],
-                'title': status['title'],
-                'author': status['author'],
-                'created_at': status['created_at'],
-                'updated_at': status['updated_at']
-            }
-            
-            # Include error if present
-            if status['error']:
-                response_data['error'] = status['error']
             
-            # Include file URLs if generation is complete
-            if status['status'] == 'completed':
-                response_data['files'] = status['files']
+            # Unchanged since the client's last poll: skip building the payload
+            etag = str(status['updated_at_ns'])
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = jsonify(_build_status_response(book_id, status))
             
-            return jsonify(response_data), 200
+            # Let browsers revalidate with If-None-Match on every poll
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        
+        # Recently confirmed missing for this requester; don't query the database again
+        owner_id = user_id or anonymous_user_id
+        if status_store.is_known_missing(book_id, owner_id):
+            return jsonify({
+                'success': False,
+                'error': 'Book not found',
+                'code': 'BOOK_NOT_FOUND'
+            }), 404
         
         # If not in memory, check database for completed books
         try:
-            book_data = db_service.get_book_by_id_and_owner(
+            book_data = db_service().get_book_by_id_and_owner(
                 book_id=book_id, 
                 user_id=user_id, 
                 anonymous_user_id=anonymous_user_id
@@ -315,11 +379,13 @@ def get_book_status(book_id: str):
                     }
                 
                 return jsonify(response_data), 200
+            
+            status_store.remember_missing(book_id, owner_id)
                 
         except DatabaseError as e:
             logger.error(f"Database error getting book status: {str(e)}")
         
-        # Book not found in memory or database
+        # Book not found in status store or database
         return jsonify({
             'success': False,
             'error': 'Book not found',
@@ -336,9 +402,180 @@ def get_book_status(book_id: str):
         }), 500
 
 
+
+@api_bp.route('/book-status-stream/<book_id>', methods=['GET'])
+@status_auth
+def stream_book_status(book_id: str):
+    """
+    Stream book generation status as server-sent events.
+    
+    Sends one event with the same payload as /book-status/<book_id> per status
+    change and closes the stream once generation completes or fails. Clients
+    should fall back to polling /book-status/<book_id> on a 404 (generation
+    no longer tracked) or when the stream closes early.
+    
+    Args:
+        book_id: Book ID from generation request
+    
+    Query Parameters:
+        token: JWT token (EventSource cannot send an Authorization header)
+        anonymous_user_id: Anonymous user ID for unauthenticated requests
+    
+    Returns:
+        text/event-stream response with status updates
+    """
+    user_id = get_current_user_id()
+    
+    # Get anonymous user ID from query params if user is not authenticated
+    anonymous_user_id = None
+    if not user_id:
+        anonymous_user_id = request.args.get('anonymous_user_id')
+        if not anonymous_user_id:
+            return jsonify({
+                'success': False,
+                'error': 'Anonymous user ID required for unauthenticated requests',
+                'code': 'ANONYMOUS_ID_REQUIRED'
+            }), 400
+    
+    status = status_store.get(book_id) if UUID_PATTERN.match(book_id) else None
+    if not status:
+        return jsonify({
+            'success': False,
+            'error': 'Book generation is not in progress',
+            'code': 'BOOK_NOT_FOUND'
+        }), 404
+    
+    if not _owns_status(status, user_id, anonymous_user_id):
+        return jsonify({
+            'success': False,
+            'error': 'Access denied',
+            'code': 'ACCESS_DENIED'
+        }), 403
+    
+    def event_stream():
+        deadline = time.monotonic() + STATUS_STREAM_MAX_SECONDS
+        for current in status_store.watch(book_id):
+            if current is None:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(_build_status_response(book_id, current), separators=(',', ':'))}\n\n"
+                if current['status'] in ('completed', 'failed'):
+                    return
+            
+            # Bound the stream so a stuck job cannot hold a worker forever;
+            # EventSource reconnects automatically
+            if time.monotonic() > deadline:
+                return
+    
+    return Response(
+        stream_with_context(event_stream()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable nginx response buffering
+        }
+    )
+
+
+def _limit_exceeded_response(limit_check: Dict[str, Any]):
+    """
+    Build the 429 response for a generation limit that has been reached.
+    
+    Args:
+        limit_check: Result of check_generation_limit()
+    
+    Returns:
+        Tuple of JSON response and status code
+    """
+    error_message = "Generation limit exceeded"
+    code = 'GENERATION_LIMIT_EXCEEDED'
+    
+    if limit_check['user_type'] == 'anonymous':
+        error_message = "You have reached the limit of 1 book for anonymous users. Please sign in to continue."
+        code = 'ANONYMOUS_LIMIT_EXCEEDED'
+    elif limit_check['subscription_status'] == 'free':
+        error_message = f"You have reached your lifetime limit of {limit_check['limit_value']} book for free accounts. Please upgrade to Pro to generate more books."
+        code = 'FREE_LIMIT_EXCEEDED'
+    elif limit_check['subscription_status'] == 'pro':
+        error_message = f"You have reached your daily limit of {limit_check['limit_value']} books. Please try again tomorrow."
+        code = 'DAILY_LIMIT_EXCEEDED'
+    
+    return jsonify({
+        'success': False,
+        'error': error_message,
+        'code': code,
+        'limit_info': limit_check
+    }), 429
+
+
+def _abandon_generation(book_id: str, limit_check: Dict[str, Any], user_id: str, anonymous_user_id: str):
+    """
+    Mark a generation that could not be started as failed and give back its quota.
+    
+    Args:
+        book_id: Book ID
+        limit_check: Result of check_generation_limit() (None if it failed)
+        user_id: User ID (None for anonymous users)
+        anonymous_user_id: Anonymous user ID (None for authenticated users)
+    """
+    status_store.update(book_id, {
+        'status': 'failed',
+        'progress': 0,
+        'current_step': 'Book generation failed',
+        'updated_at_ns': utc_now_ns()
+    })
+    
+    # The job never ran, so the user keeps the generation they reserved
+    if limit_check is not None:
+        profile_service().release_quota(limit_check, user_id=user_id, anonymous_user_id=anonymous_user_id)
+
+
+def _owns_status(status: Dict[str, Any], user_id: str, anonymous_user_id: str) -> bool:
+    """Check whether the requesting user owns a live status record."""
+    if user_id and status['user_id'] != user_id:
+        return False
+    if anonymous_user_id and status['anonymous_user_id'] != anonymous_user_id:
+        return False
+    return True
+
+
+def _build_status_response(book_id: str, status: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the status payload for a live status record.
+    
+    Args:
+        book_id: Book ID
+        status: Status record from the status store
+    
+    Returns:
+        Dict: JSON-serializable status response
+    """
+    response_data = {
+        'success': True,
+        'book_id': book_id,
+        'status': status['status'],
+        'progress': status['progress'],
+        'current_step': status['current_step'],
+        'title': status['title'],
+        'author': status['author'],
+        'created_at': status['created_at'],
+        'updated_at': iso_from_ns(status['updated_at_ns'])
+    }
+    
+    # Include error if present
+    if status['error']:
+        response_data['error'] = status['error']
+    
+    # Include file URLs if generation is complete
+    if status['status'] == 'completed':
+        response_data['files'] = status['files']
+    
+    return response_data
+
 def _generate_book_async(book_id: str, user_id: str, anonymous_user_id: str, title: str, author: str, book_type: str):
     """
-    Generate book asynchronously in background thread.
+    Generate book asynchronously in a background worker.
     
     Args:
         book_id: Unique book identifier
@@ -348,13 +585,22 @@ def _generate_book_async(book_id: str, user_id: str, anonymous_user_id: str, tit
         author: Author name
         book_type: Type of book (non-fiction)
     """
+    flight_key = single_flight.make_key(title, author, book_type)
+    flight_owner = False
+    flight_result = {'status': 'failed'}
+    
     try:
         owner_description = f"user {user_id}" if user_id else f"anonymous user {anonymous_user_id}"
         logger.info(f"Starting async book generation for '{title}' by {author} (book_id: {book_id}, owner: {owner_description})")
         
+        # Reuse an identical generation that is already running
+        flight_owner, owner_book_id = single_flight.acquire(flight_key, book_id)
+        if owner_book_id is not None and _reuse_identical_generation(book_id, user_id, owner_book_id, flight_key):
+            return
+        
         # Step 1: Generate outline (10% progress)
         _update_generation_status(book_id, 'outline_generated', 5, "Generating book outline...")
-        outline = outline_service.generate_book_outline(title)
+        outline = outline_service().generate_book_outline(title)
         _update_generation_status(book_id, 'outline_generated', 10, "Outline generated successfully")
         
         # Step 2: Generate chapters (90% progress)
@@ -363,7 +609,7 @@ def _generate_book_async(book_id: str, user_id: str, anonymous_user_id: str, tit
             _update_generation_status(book_id, 'generating_content', progress, message)
         
         _update_generation_status(book_id, 'generating_content', 10, "Starting chapter generation...")
-        chapters = chapter_service.generate_all_chapters(outline, progress_callback=chapter_progress_callback)
+        chapters = chapter_service().generate_all_chapters(outline, progress_callback=chapter_progress_callback)
         _update_generation_status(book_id, 'generating_content', 90, "All chapters generated successfully")
         
         # Step 3: Create book data
@@ -375,57 +621,48 @@ def _generate_book_async(book_id: str, user_id: str, anonymous_user_id: str, tit
             chapters=chapters
         )
         
-        # Step 4: Generate PDF (93% progress)
-        _update_generation_status(book_id, 'generating_content', 91, "Creating PDF file...")
-        pdf_url = pdf_service.create_book_pdf(book_data, user_id, book_id)
-        _update_generation_status(book_id, 'generating_content', 93, "PDF created successfully")
+        # Steps 4-6: Generate PDF, EPUB and metadata in parallel (99% progress)
+        _update_generation_status(book_id, 'generating_content', 91, "Creating PDF, EPUB and metadata files...")
         
-        # Step 5: Generate EPUB (96% progress)
-        _update_generation_status(book_id, 'generating_content', 94, "Creating EPUB file...")
-        epub_url = epub_service.create_book_epub(book_data, user_id, book_id)
-        _update_generation_status(book_id, 'generating_content', 96, "EPUB created successfully")
+        def build_pdf():
+            with _reportlab_lock:
+                return pdf_service().create_book_pdf(book_data, user_id, book_id)
         
-        # Step 6: Generate metadata (99% progress)
-        _update_generation_status(book_id, 'generating_content', 97, "Generating marketing metadata...")
-        content_summary = metadata_service.create_content_summary(book_data)
-        metadata = metadata_service.generate_book_metadata(title, author, content_summary)
-        
-        # Create metadata PDF document
-        metadata_url = metadata_service.create_metadata_document(metadata, title, author, user_id, book_id)
+        def build_metadata():
+            content_summary = metadata_service().create_content_summary(book_data)
+            metadata = metadata_service().generate_book_metadata(title, author, content_summary)
+            
+            # Create metadata PDF document
+            with _reportlab_lock:
+                return metadata_service().create_metadata_document(metadata, title, author, user_id, book_id)
+        
+        file_urls = {}
+        completion_messages = {
+            'pdf_url': "PDF created successfully",
+            'epub_url': "EPUB created successfully",
+            'metadata_url': "Marketing metadata generated successfully"
+        }
         
-        # Step 7: Complete (100% progress)
-        final_status = {
-            'status': 'completed',
-            'progress': 100,
-            'current_step': 'Book generation completed successfully!',
-            'updated_at': utc_now_iso(),
-            'files': {
-                'pdf_url': pdf_url,
-                'epub_url': epub_url,
-                'metadata_url': metadata_url
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix=f"book-{book_id[:8]}") as executor:
+            futures = {
+                executor.submit(build_pdf): 'pdf_url',
+                executor.submit(epub_service().create_book_epub, book_data, user_id, book_id): 'epub_url',
+                executor.submit(build_metadata): 'metadata_url'
             }
-        }
+            
+            # Progress is published from this thread only, in completion order
+            for completed, future in enumerate(as_completed(futures), start=1):
+                file_key = futures[future]
+                file_urls[file_key] = future.result()
+                _update_generation_status(book_id, 'generating_content', 90 + 3 * completed, completion_messages[file_key])
         
-        # Update in-memory status
-        if book_id in generation_status:
-            generation_status[book_id].update(final_status)
+        pdf_url = file_urls['pdf_url']
+        epub_url = file_urls['epub_url']
+        metadata_url = file_urls['metadata_url']
         
-        # Update database record with ALL file URLs using service client
-        try:
-            # Use service client for all background database operations
-            db_service.service_client.table('books').update({
-                'status': 'completed',
-                'progress': 100,
-                'pdf_url': pdf_url,
-                'epub_url': epub_url, 
-                'metadata_url': metadata_url,
-                'updated_at': format_for_database()
-            }).eq('id', book_id).execute()
-            
-            logger.info(f"Updated book record with file URLs: {book_id}")
-            
-        except DatabaseError as e:
-            logger.error(f"Failed to update book record in database: {str(e)}")
+        # Step 7: Complete (100% progress)
+        _complete_generation(book_id, pdf_url, epub_url, metadata_url)
+        flight_result = {'status': 'completed', 'book_id': book_id, 'user_id': user_id}
         
         logger.info(f"Successfully completed book generation for '{title}' (book_id: {book_id})")
         
@@ -434,86 +671,176 @@ def _generate_book_async(book_id: str, user_id: str, anonymous_user_id: str, tit
         logger.error(f"Error in async book generation for {book_id}: {error_msg}")
         
         # Update status with error
+        now_ns = utc_now_ns()
         error_status = {
             'status': 'failed',
             'progress': 0,
             'current_step': 'Book generation failed',
-            'updated_at': utc_now_iso(),
+            'updated_at_ns': now_ns,
             'error': str(e)
         }
         
-        if book_id in generation_status:
-            generation_status[book_id].update(error_status)
+        status_store.update(book_id, error_status)
         
         # Update database record with error using service client
         try:
             # Use service client for all background database operations
-            db_service.service_client.table('books').update({
+            progress_writer.write_now(book_id, {
                 'status': 'failed',
                 'progress': 0,
                 'error_message': str(e),
-                'updated_at': format_for_database()
-            }).eq('id', book_id).execute()
+                'updated_at': iso_from_ns(now_ns)
+            })
             
             logger.info(f"Updated book record with error: {book_id}")
             
         except DatabaseError as db_error:
             logger.error(f"Failed to update book record with error in database: {str(db_error)}")
+    
+    finally:
+        _last_progress_flush.pop(book_id, None)
+        
+        if flight_owner:
+            single_flight.publish(flight_key, book_id, flight_result)
 
 
-def _update_generation_status(book_id: str, status: str, progress: int, current_step: str):
+def _reuse_identical_generation(book_id: str, user_id: str, owner_book_id: str, flight_key: str) -> bool:
     """
-    Update generation status in memory and database using service-level access.
+    Wait for an identical in-flight generation and copy its files.
+    
+    Args:
+        book_id: Book ID of the waiting generation
+        user_id: User ID of the waiting generation (None for anonymous users)
+        owner_book_id: Book ID of the generation doing the work
+        flight_key: Single-flight key shared by both generations
+    
+    Returns:
+        bool: True if the book was completed from the shared result
+    """
+    # No time to wait and still generate independently (brpop treats 0 as "forever")
+    if SINGLE_FLIGHT_WAIT_SECONDS <= 0:
+        return False
+    
+    logger.info(f"Book {book_id} is waiting for identical generation {owner_book_id}")
+    _update_generation_status(book_id, 'generating_content', 10, "Waiting for an identical book generation to finish...")
+    
+    result = single_flight.wait(flight_key, SINGLE_FLIGHT_WAIT_SECONDS)
+    if not result or result.get('status') != 'completed':
+        logger.info(f"Identical generation did not complete, generating book {book_id} independently")
+        return False
+    
+    # Copy the finished files into this book's own storage path
+    try:
+        file_urls = {}
+        for file_key, filename in SHARED_BOOK_FILES.items():
+            source_path = storage_service().generate_storage_path(result['user_id'], result['book_id'], filename)
+            destination_path = storage_service().generate_storage_path(user_id, book_id, filename)
+            file_urls[file_key] = storage_service().copy_file(source_path, destination_path)
+    except SupabaseStorageError as e:
+        logger.warning(f"Could not copy files from {result['book_id']} to {book_id}, generating independently: {str(e)}")
+        return False
+    
+    _complete_generation(book_id, **file_urls)
+    logger.info(f"Completed book {book_id} from identical generation {result['book_id']}")
+    return True
+
+
+def _complete_generation(book_id: str, pdf_url: str, epub_url: str, metadata_url: str):
+    """
+    Mark a generation as completed in the status store and database.
     
     Args:
         book_id: Book ID
-        status: Current status
-        progress: Progress percentage
-        current_step: Current step description
+        pdf_url: PDF file URL
+        epub_url: EPUB file URL
+        metadata_url: Metadata file URL
     """
-    # Update in-memory status
-    if book_id in generation_status:
-        generation_status[book_id].update({
-            'status': status,
-            'progress': progress,
-            'current_step': current_step,
-            'updated_at': utc_now_iso()
-        })
+    now_ns = utc_now_ns()
+    final_status = {
+        'status': 'completed',
+        'progress': 100,
+        'current_step': 'Book generation completed successfully!',
+        'updated_at_ns': now_ns,
+        'files': {
+            'pdf_url': pdf_url,
+            'epub_url': epub_url,
+            'metadata_url': metadata_url
+        }
+    }
     
-    # Update database record using service client (bypasses RLS for background operations)
+    # Update live status
+    status_store.update(book_id, final_status)
+    
+    # Update database record with ALL file URLs using service client
     try:
         # Use service client for all background database operations
-        # This bypasses RLS policies since the user was already validated when generation started
-        db_service.service_client.table('books').update({
-            'status': status,
-            'progress': progress,
-            'updated_at': format_for_database()
-        }).eq('id', book_id).execute()
+        progress_writer.write_now(book_id, {
+            'status': 'completed',
+            'progress': 100,
+            'content_url': pdf_url,
+            'epub_url': epub_url,
+            'metadata_url': metadata_url,
+            'updated_at': iso_from_ns(now_ns)
+        })
         
-        logger.debug(f"Updated book {book_id} status: {status}, progress: {progress}%")
-    except Exception as e:
-        logger.error(f"Failed to update book status in database: {str(e)}")
+        logger.info(f"Updated book record with file URLs: {book_id}")
+        
+    except DatabaseError as e:
+        logger.error(f"Failed to update book record in database: {str(e)}")
 
 
-def cleanup_old_generation_status(max_age_hours: int = 24):
+def _update_generation_status(book_id: str, status: str, progress: int, current_step: str):
     """
-    Clean up old generation status entries from memory.
+    Update generation status in the status store and database using service-level access.
+    
+    The status store is always updated; database writes are debounced to at most
+    one per PROGRESS_FLUSH_INTERVAL per book unless the status changed. Terminal
+    states are written by _complete_generation and the failure handler instead.
     
     Args:
-        max_age_hours: Maximum age in hours before cleanup
+        book_id: Book ID
+        status: Current status
+        progress: Progress percentage
+        current_step: Current step description
     """
-    cutoff_time = utc_now() - timedelta(hours=max_age_hours)
+    # Update live status (only the changed fields)
+    status_store.update(book_id, {
+        'status': status,
+        'progress': progress,
+        'current_step': current_step,
+        'updated_at_ns': utc_now_ns()
+    })
     
-    # Remove old entries from memory
-    from utils.datetime_utils import from_iso_string
+    _flush_progress(book_id, status, progress)
+
+
+def _flush_progress(book_id: str, status: str, progress: int):
+    """
+    Write progress to the database if the debounce interval has elapsed.
     
-    old_entries = [
-        book_id for book_id, status in generation_status.items()
-        if from_iso_string(status['created_at']) < cutoff_time
-    ]
+    Args:
+        book_id: Book ID
+        status: Current status
+        progress: Progress percentage
+    """
+    now = time.monotonic()
+    last_flush = _last_progress_flush.get(book_id)
+    # Status transitions are always written so the stored phase stays current
+    if last_flush is not None and last_flush[1] == status and now - last_flush[0] < PROGRESS_FLUSH_INTERVAL:
+        return
+    _last_progress_flush[book_id] = (now, status)
     
-    for book_id in old_entries:
-        del generation_status[book_id]
+    fields = {
+        'status': status,
+        'progress': progress,
+        'updated_at': format_for_database()
+    }
     
-    if old_entries:
-        logger.info(f"Cleaned up {len(old_entries)} old generation status entries")
\ No newline at end of file
+    # Update database record using service client (bypasses RLS for background operations)
+    try:
+        # The user was already validated when generation started
+        progress_writer.submit(book_id, fields)
+        
+        logger.debug(f"Updated book {book_id} status: {status}, progress: {progress}%")
+    except Exception as e:
+        logger.error(f"Failed to update book status in database: {str(e)}")
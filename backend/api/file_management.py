@@ -3,20 +3,35 @@ File management API endpoints.
 """
 
 import logging
-from flask import jsonify, request
+from functools import lru_cache
+from flask import jsonify, request, Response, current_app
 from typing import Dict, Any
 
 from api import api_bp
 from lib.auth import require_auth, get_current_user_id
-from lib.supabase_storage import SupabaseStorageService, SupabaseStorageError
+from lib.supabase_storage import get_storage_service, SupabaseStorageError, BOOK_FILE_NAMES
 from lib.database_service import get_database_service, DatabaseError
+from lib.task_queue import get_task_queue, TaskQueueError
+from utils.lazy_init import LazyInstance
 
 
 logger = logging.getLogger(__name__)
 
-# Initialize services
-storage_service = SupabaseStorageService()
-db_service = get_database_service()
+# Initialize services on first use rather than at import
+storage_service = LazyInstance(get_storage_service)
+db_service = LazyInstance(get_database_service)
+
+# Deleted books' files are removed by an RQ job when a worker pool is available,
+# so the cleanup survives web worker restarts and failed attempts are retried
+task_queue = get_task_queue()
+CLEANUP_JOB_RETRIES = 3
+
+# Signed URL lifetime bounds in seconds (1 minute to 24 hours)
+DEFAULT_URL_EXPIRES_IN = 3600
+MIN_URL_EXPIRES_IN = 60
+MAX_URL_EXPIRES_IN = 86400
+
+INVALID_FILE_TYPE_MESSAGE = f'Invalid file type. Must be one of: {list(BOOK_FILE_NAMES)}'
 
 
 @api_bp.route('/book-files/<book_id>', methods=['GET'])
@@ -37,19 +52,35 @@ def get_book_files(book_id: str):
     try:
         user_id = get_current_user_id()
         
-        # Get expiration time from query parameters
-        expires_in = request.args.get('expires_in', 3600, type=int)
+        # Get expiration time from query parameters (usually omitted)
+        expires_in = DEFAULT_URL_EXPIRES_IN
+        raw_expires_in = request.args.get('expires_in')
+        if raw_expires_in is not None:
+            try:
+                expires_in = int(raw_expires_in)
+            except ValueError:
+                pass  # Malformed values fall back to the default
         
         # Validate expiration time
-        if expires_in < 60 or expires_in > 86400:  # 1 minute to 24 hours
+        if not MIN_URL_EXPIRES_IN <= expires_in <= MAX_URL_EXPIRES_IN:
             return jsonify({
                 'success': False,
                 'error': 'Invalid expires_in value (must be between 60 and 86400 seconds)',
                 'code': 'INVALID_EXPIRATION'
             }), 400
         
+        # Signed URLs are cached per process and a delete only clears the cache
+        # of the worker that handled it, so confirm the book still exists first
+        if not db_service().book_exists(book_id, user_id):
+            storage_service().invalidate_book_file_urls(user_id, book_id)
+            return jsonify({
+                'success': False,
+                'error': 'Book not found',
+                'code': 'BOOK_NOT_FOUND'
+            }), 404
+        
         # Get file URLs
-        file_urls = storage_service.get_book_file_urls(user_id, book_id, expires_in)
+        file_urls = storage_service().get_book_file_urls(user_id, book_id, expires_in)
         
         # Check if any files exist
         if not any(file_urls.values()):
@@ -59,7 +90,7 @@ def get_book_files(book_id: str):
                 'code': 'FILES_NOT_FOUND'
             }), 404
         
-        logger.info(f"Generated file URLs for book {book_id} (user {user_id})")
+        logger.info("Generated file URLs for book %s (user %s)", book_id, user_id)
         
         return jsonify({
             'success': True,
@@ -72,8 +103,16 @@ def get_book_files(book_id: str):
             }
         }), 200
         
+    except DatabaseError as e:
+        logger.error("Database error getting files for book %s: %s", book_id, e)
+        return jsonify({
+            'success': False,
+            'error': 'Database error',
+            'code': 'DATABASE_ERROR',
+            'message': str(e)
+        }), 500
     except SupabaseStorageError as e:
-        logger.error(f"Storage error getting files for book {book_id}: {str(e)}")
+        logger.error("Storage error getting files for book %s: %s", book_id, e)
         return jsonify({
             'success': False,
             'error': 'Storage error',
@@ -81,7 +120,7 @@ def get_book_files(book_id: str):
             'message': str(e)
         }), 500
     except Exception as e:
-        logger.error(f"Error getting files for book {book_id}: {str(e)}")
+        logger.error("Error getting files for book %s: %s", book_id, e)
         return jsonify({
             'success': False,
             'error': 'Failed to get book files',
@@ -105,50 +144,49 @@ def delete_book(book_id: str):
     try:
         user_id = get_current_user_id()
         
-        # First, check if book exists and user has access
+        # Without a worker pool nothing would retry a background cleanup, so
+        # delete the files before the record
+        files_deleted = None
+        if not task_queue.is_distributed:
+            files_deleted = storage_service().cleanup_book_files(user_id, book_id)
+            logger.info("Storage cleanup completed for book %s: %s", book_id, files_deleted)
+        
+        # Delete book record from database; no match means it doesn't exist or isn't the user's
         try:
-            book_data = db_service.get_book(book_id, user_id)
-            if not book_data:
+            if not db_service().delete_book_if_exists(book_id, user_id):
                 return jsonify({
                     'success': False,
                     'error': 'Book not found',
                     'code': 'BOOK_NOT_FOUND'
                 }), 404
-        except DatabaseError as e:
-            logger.error(f"Error checking book existence for deletion {book_id}: {str(e)}")
-            return jsonify({
-                'success': False,
-                'error': 'Database error during deletion',
-                'code': 'DATABASE_ERROR',
-                'message': str(e)
-            }), 500
-        
-        # Delete files from storage first
-        files_deleted = False
-        try:
-            files_deleted = storage_service.cleanup_book_files(user_id, book_id)
-            logger.info(f"Storage cleanup completed for book {book_id}: {files_deleted}")
-        except SupabaseStorageError as e:
-            logger.warning(f"Storage cleanup failed for book {book_id}: {str(e)}")
-            # Continue with database deletion even if storage cleanup fails
-        
-        # Delete book record from database
-        try:
-            db_service.delete_book(book_id, user_id)
-            logger.info(f"Successfully deleted book {book_id} from database for user {user_id}")
+            logger.info("Successfully deleted book %s from database for user %s", book_id, user_id)
+            
+            # The book is gone once its record is; a queued job removes its files
+            cleanup_scheduled = False
+            if files_deleted is None:
+                try:
+                    task_queue.enqueue(_remove_book_files, user_id, book_id, retries=CLEANUP_JOB_RETRIES)
+                    cleanup_scheduled = True
+                except TaskQueueError as e:
+                    logger.warning("Could not queue file cleanup for book %s, removing files now: %s", book_id, e)
+                    files_deleted = storage_service().cleanup_book_files(user_id, book_id)
+            
+            details = {
+                'database_deleted': True,
+                'files_cleanup_scheduled': cleanup_scheduled
+            }
+            if files_deleted is not None:
+                details['files_deleted'] = files_deleted
             
             return jsonify({
                 'success': True,
                 'book_id': book_id,
-                'message': 'Book and associated files deleted successfully',
-                'details': {
-                    'database_deleted': True,
-                    'files_deleted': files_deleted
-                }
+                'message': 'Book deleted successfully; associated files are being removed' if cleanup_scheduled else 'Book and associated files deleted successfully',
+                'details': details
             }), 200
             
         except DatabaseError as e:
-            logger.error(f"Failed to delete book {book_id} from database: {str(e)}")
+            logger.error("Failed to delete book %s from database: %s", book_id, e)
             return jsonify({
                 'success': False,
                 'error': 'Failed to delete book from database',
@@ -157,7 +195,7 @@ def delete_book(book_id: str):
             }), 500
         
     except Exception as e:
-        logger.error(f"Unexpected error deleting book {book_id}: {str(e)}")
+        logger.error("Unexpected error deleting book %s: %s", book_id, e)
         return jsonify({
             'success': False,
             'error': 'Unexpected error during deletion',
@@ -166,6 +204,19 @@ def delete_book(book_id: str):
         }), 500
 
 
+def _remove_book_files(user_id: str, book_id: str):
+    """
+    Remove a deleted book's files from storage (runs as a background job).
+    
+    Raises on failure so the queue records the job as failed and retries it.
+    
+    Args:
+        user_id: User ID
+        book_id: Book ID
+    """
+    storage_service().cleanup_book_files(user_id, book_id, raise_errors=True)
+
+
 @api_bp.route('/file-info/<book_id>/<file_type>', methods=['GET'])
 @require_auth
 def get_file_info(book_id: str, file_type: str):
@@ -183,25 +234,19 @@ def get_file_info(book_id: str, file_type: str):
         user_id = get_current_user_id()
         
         # Validate file type
-        valid_file_types = {
-            'pdf': 'book.pdf',
-            'epub': 'book.epub',
-            'metadata': 'metadata.pdf'
-        }
-        
-        if file_type not in valid_file_types:
+        filename = BOOK_FILE_NAMES.get(file_type)
+        if filename is None:
             return jsonify({
                 'success': False,
-                'error': f'Invalid file type. Must be one of: {list(valid_file_types.keys())}',
+                'error': INVALID_FILE_TYPE_MESSAGE,
                 'code': 'INVALID_FILE_TYPE'
             }), 400
         
         # Generate storage path
-        filename = valid_file_types[file_type]
-        storage_path = storage_service.generate_storage_path(user_id, book_id, filename)
+        storage_path = storage_service().generate_storage_path(user_id, book_id, filename)
         
         # Get file information
-        file_info = storage_service.get_file_info(storage_path)
+        file_info = storage_service().get_file_info(storage_path)
         
         if not file_info:
             return jsonify({
@@ -210,7 +255,7 @@ def get_file_info(book_id: str, file_type: str):
                 'code': 'FILE_NOT_FOUND'
             }), 404
         
-        logger.info(f"Retrieved file info for {file_type} of book {book_id} (user {user_id})")
+        logger.info("Retrieved file info for %s of book %s (user %s)", file_type, book_id, user_id)
         
         return jsonify({
             'success': True,
@@ -220,7 +265,7 @@ def get_file_info(book_id: str, file_type: str):
         }), 200
         
     except SupabaseStorageError as e:
-        logger.error(f"Storage error getting file info for {book_id}/{file_type}: {str(e)}")
+        logger.error("Storage error getting file info for %s/%s: %s", book_id, file_type, e)
         return jsonify({
             'success': False,
             'error': 'Storage error',
@@ -228,7 +273,7 @@ def get_file_info(book_id: str, file_type: str):
             'message': str(e)
         }), 500
     except Exception as e:
-        logger.error(f"Error getting file info for {book_id}/{file_type}: {str(e)}")
+        logger.error("Error getting file info for %s/%s: %s", book_id, file_type, e)
         return jsonify({
             'success': False,
             'error': 'Failed to get file information',
@@ -250,22 +295,28 @@ def get_storage_status():
         user_id = get_current_user_id()
         
         # Basic storage service info
-        status_info = {
-            'success': True,
-            'storage_service': 'supabase',
-            'bucket_name': storage_service.bucket_name,
-            'service_status': 'operational'
-        }
+        status_body = _storage_status_body(storage_service().bucket_name)
         
-        logger.info(f"Storage status requested by user {user_id}")
+        logger.info("Storage status requested by user %s", user_id)
         
-        return jsonify(status_info), 200
+        return Response(status_body, status=200, mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"Error getting storage status: {str(e)}")
+        logger.error("Error getting storage status: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to get storage status',
             'code': 'STORAGE_STATUS_ERROR',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@lru_cache(maxsize=1)
+def _storage_status_body(bucket_name: str) -> bytes:
+    """Serialize the storage status response, which only depends on the bucket name."""
+    return current_app.json.dumps({
+        'success': True,
+        'storage_service': 'supabase',
+        'bucket_name': bucket_name,
+        'service_status': 'operational'
+    }).encode()
@@ -3,14 +3,34 @@ Health check API endpoints.
 """
 
 import os
+import time
 import logging
-from flask import jsonify
+import threading
+from typing import Dict, Optional
+from flask import jsonify, Response
 from api import api_bp
-from utils.datetime_utils import utc_now_iso
+from utils.datetime_utils import utc_now_iso_seconds
 
 
 logger = logging.getLogger(__name__)
 
+# Environment variables the service cannot run without
+REQUIRED_ENV_VARS = ['SUPABASE_URL', 'SECRET_KEY', 'GEMINI_API_KEY']
+
+# The environment is loaded before the blueprint is imported and doesn't change afterwards
+_missing_env_vars = [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
+
+# Liveness responses only differ in their timestamp
+_LIVE_PREFIX = b'{"alive":true,"service":"flask-book-generator","timestamp":"'
+_LIVE_SUFFIX = b'"}'
+
+# Dependency check results are reused for this many seconds
+DEPENDENCY_CHECK_TTL = 30
+
+_dependency_status: Optional[Dict[str, bool]] = None
+_dependency_checked_at = 0.0
+_dependency_lock = threading.Lock()
+
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
@@ -24,14 +44,10 @@ def health_check():
         # Check critical dependencies
         checks = {
             'status': 'healthy',
-            'timestamp': utc_now_iso(),
+            'timestamp': utc_now_iso_seconds(),
             'version': os.environ.get('APP_VERSION', 'unknown'),
             'service': 'flask-book-generator',
-            'dependencies': {
-                'supabase': _check_supabase_connection(),
-                'gemini_api': _check_gemini_api_key(),
-                'storage': _check_storage_configuration()
-            }
+            'dependencies': _get_dependency_status()
         }
         
         # Determine overall health status
@@ -49,7 +65,7 @@ def health_check():
         logger.error(f"Health check error: {str(e)}")
         return jsonify({
             'status': 'error',
-            'timestamp': utc_now_iso(),
+            'timestamp': utc_now_iso_seconds(),
             'error': str(e)
         }), 500
 
@@ -64,27 +80,16 @@ def readiness_check():
     """
     try:
         # Check if all required environment variables are set
-        required_vars = [
-            'SUPABASE_URL',
-            'SECRET_KEY',
-            'GEMINI_API_KEY'
-        ]
-        
-        missing_vars = []
-        for var in required_vars:
-            if not os.getenv(var):
-                missing_vars.append(var)
-        
-        if missing_vars:
+        if _missing_env_vars:
             return jsonify({
                 'ready': False,
-                'timestamp': utc_now_iso(),
-                'error': f'Missing required environment variables: {missing_vars}'
+                'timestamp': utc_now_iso_seconds(),
+                'error': f'Missing required environment variables: {_missing_env_vars}'
             }), 503
         
         return jsonify({
             'ready': True,
-            'timestamp': utc_now_iso(),
+            'timestamp': utc_now_iso_seconds(),
             'service': 'flask-book-generator'
         }), 200
         
@@ -92,7 +97,7 @@ def readiness_check():
         logger.error(f"Readiness check error: {str(e)}")
         return jsonify({
             'ready': False,
-            'timestamp': utc_now_iso(),
+            'timestamp': utc_now_iso_seconds(),
             'error': str(e)
         }), 500
 
@@ -105,20 +110,32 @@ def liveness_check():
     Returns:
         Simple response indicating the service is alive
     """
-    return jsonify({
-        'alive': True,
-        'timestamp': utc_now_iso(),
-        'service': 'flask-book-generator'
-    }), 200
+    return Response(_LIVE_PREFIX + utc_now_iso_seconds().encode() + _LIVE_SUFFIX, status=200, mimetype='application/json')
+
+
+def _get_dependency_status() -> Dict[str, bool]:
+    """Get dependency check results, re-running the checks at most every DEPENDENCY_CHECK_TTL seconds."""
+    global _dependency_status, _dependency_checked_at
+    with _dependency_lock:
+        now = time.monotonic()
+        if _dependency_status is None or now - _dependency_checked_at >= DEPENDENCY_CHECK_TTL:
+            _dependency_status = {
+                'supabase': _check_supabase_connection(),
+                'gemini_api': _check_gemini_api_key(),
+                'storage': _check_storage_configuration()
+            }
+            _dependency_checked_at = now
+        # Copy so callers can't modify the cached results
+        return dict(_dependency_status)
 
 
 def _check_supabase_connection() -> bool:
     """Check if Supabase connection is working."""
     try:
-        from lib.supabase_storage import SupabaseStorageService
+        from lib.supabase_storage import get_storage_service
         
         # Try to initialize storage service
-        storage = SupabaseStorageService()
+        storage = get_storage_service()
         
         # Test basic storage operation
         return storage.bucket_name == 'books'
@@ -141,10 +158,10 @@ def _check_gemini_api_key() -> bool:
 def _check_storage_configuration() -> bool:
     """Check if storage configuration is valid."""
     try:
-        from lib.supabase_storage import SupabaseStorageService
+        from lib.supabase_storage import get_storage_service
         
         # Try to initialize storage service and validate configuration
-        storage = SupabaseStorageService()
+        storage = get_storage_service()
         
         # Test that we can generate storage paths
         test_path = storage.generate_storage_path("test_user", "test_book", "test.pdf")
@@ -4,7 +4,7 @@ Main Flask API application entry point for the AI Book Generator.
 
 import os
 import logging
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -13,6 +13,7 @@ load_dotenv()
 
 from config import Config, get_config
 from utils.logging_config import setup_logging
+from utils.json_provider import ORJSONProvider
 from api import api_bp
 from lib.rate_limiter import create_limiter, apply_rate_limits
 
@@ -26,6 +27,9 @@ ConfigClass = get_config()
 app = Flask(__name__)
 app.config.from_object(ConfigClass)
 
+# Serialize jsonify() responses with orjson (keys unsorted; the frontend doesn't rely on order)
+app.json = ORJSONProvider(app)
+
 # Enable CORS for frontend requests with comprehensive configuration
 CORS(app, 
      origins=ConfigClass.CORS_ORIGINS,
@@ -49,24 +53,44 @@ app.register_blueprint(api_bp)
 apply_rate_limits(limiter)
 
 # Root endpoint - redirect to API documentation or health check
+_ROOT_BODY = app.json.dumps({
+    'service': 'Flask Book Generator API',
+    'version': os.getenv('APP_VERSION', '1.0.0'),
+    'status': 'operational',
+    'endpoints': {
+        'health': '/api/health',
+        'generate_book': '/api/generate-book',
+        'book_status': '/api/book-status/<book_id>',
+        'book_status_stream': '/api/book-status-stream/<book_id>',
+        'book_files': '/api/book-files/<book_id>',
+        'delete_book': '/api/book-delete/<book_id>'
+    },
+    'documentation': 'See API endpoints above for available operations'
+}).encode()
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint providing API information."""
-    return jsonify({
-        'service': 'Flask Book Generator API',
-        'version': os.getenv('APP_VERSION', '1.0.0'),
-        'status': 'operational',
-        'endpoints': {
-            'health': '/api/health',
-            'generate_book': '/api/generate-book',
-            'book_status': '/api/book-status/<book_id>',
-            'book_files': '/api/book-files/<book_id>',
-            'delete_book': '/api/book-delete/<book_id>'
-        },
-        'documentation': 'See API endpoints above for available operations'
-    }), 200
+    return Response(_ROOT_BODY, status=200, mimetype='application/json')
 
 # Global error handlers
+def _error_body(error: str, code: str, message: str) -> bytes:
+    """Serialize a standard error response body."""
+    return app.json.dumps({
+        'success': False,
+        'error': error,
+        'code': code,
+        'message': message
+    }).encode()
+
+# Static error bodies are serialized once; each response still gets its own
+# Response object because after-request hooks (e.g. CORS) modify headers
+_UNAUTHORIZED_BODY = _error_body('Unauthorized', 'UNAUTHORIZED', 'Authentication required or invalid credentials')
+_FORBIDDEN_BODY = _error_body('Forbidden', 'FORBIDDEN', 'Access denied')
+_NOT_FOUND_BODY = _error_body('Not Found', 'NOT_FOUND', 'The requested resource was not found')
+_METHOD_NOT_ALLOWED_BODY = _error_body('Method Not Allowed', 'METHOD_NOT_ALLOWED', 'The requested method is not allowed for this endpoint')
+_INTERNAL_ERROR_BODY = _error_body('Internal Server Error', 'INTERNAL_ERROR', 'An unexpected error occurred')
+
 @app.errorhandler(400)
 def bad_request(error):
     """Handle 400 Bad Request errors."""
@@ -80,69 +104,44 @@ def bad_request(error):
 @app.errorhandler(401)
 def unauthorized(error):
     """Handle 401 Unauthorized errors."""
-    return jsonify({
-        'success': False,
-        'error': 'Unauthorized',
-        'code': 'UNAUTHORIZED',
-        'message': 'Authentication required or invalid credentials'
-    }), 401
+    return Response(_UNAUTHORIZED_BODY, status=401, mimetype='application/json')
 
 @app.errorhandler(403)
 def forbidden(error):
     """Handle 403 Forbidden errors."""
-    return jsonify({
-        'success': False,
-        'error': 'Forbidden',
-        'code': 'FORBIDDEN',
-        'message': 'Access denied'
-    }), 403
+    return Response(_FORBIDDEN_BODY, status=403, mimetype='application/json')
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 Not Found errors."""
-    return jsonify({
-        'success': False,
-        'error': 'Not Found',
-        'code': 'NOT_FOUND',
-        'message': 'The requested resource was not found'
-    }), 404
+    return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 @app.errorhandler(405)
 def method_not_allowed(error):
     """Handle 405 Method Not Allowed errors."""
-    return jsonify({
-        'success': False,
-        'error': 'Method Not Allowed',
-        'code': 'METHOD_NOT_ALLOWED',
-        'message': 'The requested method is not allowed for this endpoint'
-    }), 405
+    return Response(_METHOD_NOT_ALLOWED_BODY, status=405, mimetype='application/json')
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 Internal Server Error."""
-    logger.error(f"Internal server error: {str(error)}")
-    return jsonify({
-        'success': False,
-        'error': 'Internal Server Error',
-        'code': 'INTERNAL_ERROR',
-        'message': 'An unexpected error occurred'
-    }), 500
+    logger.error("Internal server error: %s", error)
+    return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
 
 # Request logging middleware
-@app.before_request
 def log_request_info():
     """Log incoming requests for debugging."""
-    from flask import request
-    if app.config.get('DEBUG'):
-        logger.debug(f"Request: {request.method} {request.url}")
+    logger.debug("Request: %s %s", request.method, request.url)
 
-@app.after_request
 def log_response_info(response):
     """Log response information."""
-    if app.config.get('DEBUG'):
-        logger.debug(f"Response: {response.status_code}")
+    logger.debug("Response: %s", response.status_code)
     return response
 
+# Only hook into every request when debugging
+if app.config.get('DEBUG'):
+    app.before_request(log_request_info)
+    app.after_request(log_response_info)
+
 if __name__ == '__main__':
     logger.info("Starting Flask Book Generator API service")
     
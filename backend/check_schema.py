@@ -1,12 +1,37 @@
 import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
 from supabase import create_client
 
+@lru_cache(maxsize=None)
+def get_client(key_name='SUPABASE_KEY'):
+    """Get a Supabase client shared by all checks, so its connections are reused."""
+    load_dotenv()
+    return create_client(os.getenv('SUPABASE_URL'), os.getenv(key_name))
+
+def fetch_table_columns(client, tables):
+    """Get column names for all tables with one RPC call (see db_schema/get_public_schema.sql).
+    
+    Returns None if the function is not installed.
+    """
+    try:
+        result = client.rpc('get_public_schema', {'tables': tables}).execute()
+    except Exception as e:
+        print(f'⚠️  get_public_schema() not available, probing tables one by one: {str(e)[:50]}...')
+        return None
+    
+    columns = defaultdict(list)
+    for row in result.data:
+        columns[row['table_name']].append(row['column_name'])
+    return columns
+
 def check_database_schema():
     """Check the complete database schema by testing each table."""
     
-    load_dotenv()
-    client = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+    client = get_client()
     
     print('🔍 Checking database tables and their structure...')
     
@@ -18,13 +43,45 @@ def check_database_schema():
         'auth_mfa_challenges', 'auth_mfa_amr_claims', 'auth_refresh_tokens'
     ]
     
-    existing_tables = []
+    # get_public_schema() is only executable by the service role
+    table_columns = fetch_table_columns(get_client('SECRET_KEY'), tables_to_check)
+    if table_columns is not None:
+        existing_tables = [table for table in tables_to_check if table in table_columns]
+        for table in tables_to_check:
+            if table in table_columns:
+                print(f'✅ {table} table exists')
+                print(f'   Columns: {table_columns[table]}')
+            else:
+                print(f'❌ {table} table does not exist')
+        
+        print(f'\n📊 Summary: {len(existing_tables)} tables found')
+        print('Existing tables:', existing_tables)
+        
+        print('\n📋 Detailed Table Structure:')
+        print('=' * 80)
+        
+        for table in existing_tables:
+            print(f'\n📋 {table.upper()} TABLE:')
+            print('-' * 40)
+            for column in table_columns[table]:
+                print(f'  - {column}')
+        return
     
-    for table in tables_to_check:
+    # Sample rows per existing table, reused for the detailed structure below
+    table_samples = {}
+    
+    # Probe all tables concurrently; results are printed in the original order
+    with ThreadPoolExecutor(max_workers=len(tables_to_check)) as executor:
+        futures = {
+            table: executor.submit(lambda t=table: client.table(t).select('*').limit(1).execute())
+            for table in tables_to_check
+        }
+    
+    for table, future in futures.items():
         try:
             # Try to get a sample record to see structure
-            result = client.table(table).select('*').limit(1).execute()
-            existing_tables.append(table)
+            result = future.result()
+            table_samples[table] = result.data
             print(f'✅ {table} table exists')
             
             # If there's data, show the columns
@@ -36,32 +93,27 @@ def check_database_schema():
         except Exception as e:
             print(f'❌ {table} table does not exist: {str(e)[:50]}...')
     
-    print(f'\n📊 Summary: {len(existing_tables)} tables found')
-    print('Existing tables:', existing_tables)
+    print(f'\n📊 Summary: {len(table_samples)} tables found')
+    print('Existing tables:', list(table_samples))
     
-    # Now get detailed structure for existing tables
+    # Now show detailed structure for existing tables
     print('\n📋 Detailed Table Structure:')
     print('=' * 80)
     
-    for table in existing_tables:
-        try:
-            result = client.table(table).select('*').limit(1).execute()
-            if result.data:
-                print(f'\n📋 {table.upper()} TABLE:')
-                print('-' * 40)
-                for column in result.data[0].keys():
-                    print(f'  - {column}')
-            else:
-                print(f'\n📋 {table.upper()} TABLE (empty):')
-                print('  - No columns to show (table is empty)')
-        except Exception as e:
-            print(f'\n❌ Error getting {table} structure: {str(e)}')
+    for table, data in table_samples.items():
+        if data:
+            print(f'\n📋 {table.upper()} TABLE:')
+            print('-' * 40)
+            for column in data[0].keys():
+                print(f'  - {column}')
+        else:
+            print(f'\n📋 {table.upper()} TABLE (empty):')
+            print('  - No columns to show (table is empty)')
 
 def check_table_records():
     """Check how many records are in each table."""
     
-    load_dotenv()
-    client = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+    client = get_client()
     
     print('\n📊 Checking table record counts...')
     
@@ -69,12 +121,17 @@ def check_table_records():
     
     for table in tables_to_check:
         try:
-            result = client.table(table).select('*', count='exact').execute()
-            count = result.count if hasattr(result, 'count') else len(result.data)
+            # HEAD request: only the count comes back, not the rows
+            result = client.table(table).select('id', count='exact', head=True).execute()
+            count = result.count
             print(f'📊 {table}: {count} records')
         except Exception as e:
             print(f'❌ {table}: Error getting count - {str(e)[:50]}...')
 
 if __name__ == "__main__":
+    # The report is printed after the queries finish, so block-buffer it
+    # instead of flushing every line to the terminal
+    sys.stdout.reconfigure(line_buffering=False)
+    
     check_database_schema()
     check_table_records() 
\ No newline at end of file
@@ -6,9 +6,32 @@ Use with caution - this will delete all user profiles and associated data.
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
 from supabase import create_client
 
+@lru_cache(maxsize=None)
+def get_client(key_name):
+    """Get a Supabase client per key, shared by all steps so its connections are reused."""
+    return create_client(os.getenv('SUPABASE_URL'), os.getenv(key_name))
+
+def count_user_data(service_client):
+    """Count profiles, books and billing events, in one RPC when cleanup_counts() is installed."""
+    try:
+        counts = service_client.rpc('cleanup_counts').execute().data[0]
+        return counts['profiles'], counts['books'], counts['billing']
+    except Exception:
+        pass
+    
+    # HEAD requests: only the counts come back, not the rows
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        profiles_future = executor.submit(lambda: service_client.table('profiles').select('id', count='exact', head=True).execute())
+        books_future = executor.submit(lambda: service_client.table('books').select('id', count='exact', head=True).execute())
+        billing_future = executor.submit(lambda: service_client.table('billing_events').select('id', count='exact', head=True).execute())
+    
+    return profiles_future.result().count or 0, books_future.result().count or 0, billing_future.result().count or 0
+
 def cleanup_database():
     """Clean all user data from database for fresh start."""
     
@@ -25,7 +48,7 @@ def cleanup_database():
         return False
     
     # Use service key for cleanup operations
-    service_client = create_client(supabase_url, supabase_service_key)
+    service_client = get_client('SECRET_KEY')
     
     print("🧹 Starting database cleanup...")
     print("=" * 50)
@@ -34,29 +57,37 @@ def cleanup_database():
     print("\n1. Checking current database state...")
     
     try:
+        # Query all three tables concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Only the first 5 profiles and books are shown, so fetch the displayed
+            # columns for those plus the total counts
+            profiles_future = executor.submit(lambda: service_client.table('profiles').select('id,full_name', count='exact').limit(5).execute())
+            books_future = executor.submit(lambda: service_client.table('books').select('id,title,user_id,anonymous_user_id', count='exact').limit(5).execute())
+            billing_future = executor.submit(lambda: service_client.table('billing_events').select('id', count='exact', head=True).execute())
+        
         # Check profiles
-        profiles_result = service_client.table('profiles').select('*').execute()
-        profile_count = len(profiles_result.data) if profiles_result.data else 0
+        profiles_result = profiles_future.result()
+        profile_count = profiles_result.count or 0
         print(f"   Profiles found: {profile_count}")
         
         if profiles_result.data:
-            for profile in profiles_result.data:
+            for profile in profiles_result.data:  # Show first 5
                 print(f"   - Profile ID: {profile.get('id')} ({profile.get('full_name', 'No name')})")
         
         # Check books  
-        books_result = service_client.table('books').select('*').execute()
-        book_count = len(books_result.data) if books_result.data else 0
+        books_result = books_future.result()
+        book_count = books_result.count or 0
         print(f"   Books found: {book_count}")
         
         if books_result.data:
-            for book in books_result.data[:5]:  # Show first 5
+            for book in books_result.data:  # Show first 5
                 user_id = book.get('user_id', 'anonymous')
                 anonymous_id = book.get('anonymous_user_id', 'none')
                 print(f"   - Book: {book.get('title')} (user: {user_id}, anon: {anonymous_id})")
         
         # Check billing events
-        billing_result = service_client.table('billing_events').select('*').execute()
-        billing_count = len(billing_result.data) if billing_result.data else 0
+        billing_result = billing_future.result()
+        billing_count = billing_result.count or 0
         print(f"   Billing events found: {billing_count}")
         
     except Exception as e:
@@ -81,36 +112,38 @@ def cleanup_database():
     print("\n2. Deleting data...")
     
     try:
-        # Delete billing events first (may have foreign keys)
-        if billing_count > 0:
-            billing_delete = service_client.table('billing_events').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-            print(f"   ✅ Deleted billing events")
-        
-        # Delete books
-        if book_count > 0:
-            books_delete = service_client.table('books').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-            print(f"   ✅ Deleted books")
-        
-        # Delete profiles last
-        if profile_count > 0:
-            profiles_delete = service_client.table('profiles').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-            print(f"   ✅ Deleted profiles")
+        # Truncate all three tables server-side in one call (see db_schema/cleanup_all_user_data.sql)
+        service_client.rpc('cleanup_all_user_data').execute()
+        print(f"   ✅ Truncated billing events, books and profiles")
         
     except Exception as e:
-        print(f"   ❌ Error during deletion: {str(e)}")
-        return False
+        print(f"   ⚠️  cleanup_all_user_data() not available, deleting table by table: {str(e)[:50]}")
+        
+        try:
+            # Delete billing events first (may have foreign keys)
+            if billing_count > 0:
+                service_client.table('billing_events').delete(returning='minimal').neq('id', '00000000-0000-0000-0000-000000000000').execute()
+                print(f"   ✅ Deleted billing events")
+            
+            # Delete books
+            if book_count > 0:
+                service_client.table('books').delete(returning='minimal').neq('id', '00000000-0000-0000-0000-000000000000').execute()
+                print(f"   ✅ Deleted books")
+            
+            # Delete profiles last
+            if profile_count > 0:
+                service_client.table('profiles').delete(returning='minimal').neq('id', '00000000-0000-0000-0000-000000000000').execute()
+                print(f"   ✅ Deleted profiles")
+            
+        except Exception as e:
+            print(f"   ❌ Error during deletion: {str(e)}")
+            return False
     
     # Step 4: Verify cleanup
     print("\n3. Verifying cleanup...")
     
     try:
-        profiles_check = service_client.table('profiles').select('*').execute()
-        books_check = service_client.table('books').select('*').execute()
-        billing_check = service_client.table('billing_events').select('*').execute()
-        
-        remaining_profiles = len(profiles_check.data) if profiles_check.data else 0
-        remaining_books = len(books_check.data) if books_check.data else 0
-        remaining_billing = len(billing_check.data) if billing_check.data else 0
+        remaining_profiles, remaining_books, remaining_billing = count_user_data(service_client)
         
         print(f"   Profiles remaining: {remaining_profiles}")
         print(f"   Books remaining: {remaining_books}")
@@ -132,7 +165,7 @@ def check_rls_policies():
     """Check RLS policies on profiles table."""
     
     load_dotenv()
-    service_client = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+    service_client = get_client('SECRET_KEY')
     
     print("\n4. Checking RLS policies...")
     
@@ -140,7 +173,7 @@ def check_rls_policies():
         # This would require PostgreSQL admin access to check policies
         # For now, just test table access with different clients
         
-        regular_client = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+        regular_client = get_client('SUPABASE_KEY')
         
         print("   Testing table access...")
         print("   - Service client access: ", end="")
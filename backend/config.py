@@ -4,6 +4,7 @@ Configuration settings for the Flask Book Generator API.
 
 import os
 import logging
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -25,11 +26,13 @@ class Config:
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     
     # CORS settings
-    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
+    CORS_ORIGINS = tuple(
+        origin.strip() for origin in os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',') if origin.strip()
+    )
     
     # File settings
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max file size
-    ALLOWED_EXTENSIONS = {'.pdf', '.epub', '.json', '.txt', '.md'}
+    ALLOWED_EXTENSIONS = frozenset({'.pdf', '.epub', '.json', '.txt', '.md'})
     
     # Book generation settings
     TARGET_CHAPTER_WORD_COUNT = 1400
@@ -85,10 +88,8 @@ class Config:
             'GEMINI_API_KEY'
         ]
         
-        missing_vars = []
-        for var in required_vars:
-            if not getattr(cls, var) or not os.environ.get(var):
-                missing_vars.append(var)
+        # Attributes are read from the environment when the class is defined
+        missing_vars = [var for var in required_vars if not getattr(cls, var)]
         
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {missing_vars}")
@@ -266,8 +267,9 @@ config = {
 }
 
 
+@lru_cache(maxsize=1)
 def get_config():
-    """Get configuration based on environment."""
+    """Get configuration based on environment (resolved once per process)."""
     env = os.environ.get('FLASK_ENV', 'development').lower()
     return config.get(env, config['default'])
 
@@ -2,58 +2,94 @@
 Debug script to test Gemini API connection and responses.
 """
 
+import io
 import os
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, TextIO
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib json module
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
-def test_api_connection():
-    """Test basic API connection and response."""
-    print("🔍 Testing Gemini API connection...")
+MODEL_NAME = 'gemini-2.5-flash'
+API_KEY = os.getenv('GEMINI_API_KEY')
+if API_KEY:
+    genai.configure(api_key=API_KEY)
+
+# Same generation parameters as the outline service
+OUTLINE_GENERATION_CONFIG = genai.types.GenerationConfig(
+    temperature=0.7,
+    top_p=0.8,
+    top_k=40,
+    max_output_tokens=8192,
+)
+
+# Fields every outline chapter must have
+CHAPTER_FIELDS = ('number', 'title', 'summary')
+
+@lru_cache(maxsize=4)
+def get_model(name: str = MODEL_NAME) -> genai.GenerativeModel:
+    """Get a shared model instance so every test reuses the same client."""
+    return genai.GenerativeModel(name)
+
+def test_api_connection(out: TextIO = sys.stdout):
+    """Test basic API connection and response.
+
+    Args:
+        out: Stream the test reports to
+    """
+    print("🔍 Testing Gemini API connection...", file=out)
     
     # Check API key
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        print("❌ GEMINI_API_KEY not found in environment variables")
+    if not API_KEY:
+        print("❌ GEMINI_API_KEY not found in environment variables", file=out)
         return False
     
-    print(f"✅ API key found: {api_key[:10]}...")
+    print(f"✅ API key found: {API_KEY[:10]}...", file=out)
     
     try:
-        # Configure API
-        genai.configure(api_key=api_key)
-        
         # Test with a simple prompt
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = get_model()
         
-        print("📡 Testing simple API call...")
+        print("📡 Testing simple API call...", file=out)
         response = model.generate_content("Hello, please respond with 'API test successful'")
         
         if response.text:
-            print(f"✅ API Response: {response.text}")
+            print(f"✅ API Response: {response.text}", file=out)
             return True
         else:
-            print("❌ Empty response from API")
+            print("❌ Empty response from API", file=out)
             return False
             
     except Exception as e:
-        print(f"❌ API Error: {str(e)}")
+        print(f"❌ API Error: {str(e)}", file=out)
         return False
 
-def test_outline_prompt():
-    """Test the specific outline generation prompt."""
-    print("\n🔍 Testing outline generation prompt...")
+def test_outline_prompt(out: TextIO = sys.stdout, stop: Optional[threading.Event] = None):
+    """Test the specific outline generation prompt.
+
+    Args:
+        out: Stream the test reports to
+        stop: Event that abandons the request once set
+    """
+    print("\n🔍 Testing outline generation prompt...", file=out)
     
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        print("❌ API key not available")
+    if not API_KEY:
+        print("❌ API key not available", file=out)
         return False
     
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = get_model()
         
         # Use the same prompt as our service
         book_title = "Test Book"
@@ -87,44 +123,67 @@ Return your response as valid JSON in this exact format:
 Do not include any text before or after the JSON. Only return valid JSON.
 """
         
-        print("📡 Sending outline generation request...")
+        print("📡 Sending outline generation request...", file=out)
         
-        # Configure generation parameters
-        generation_config = genai.types.GenerationConfig(
-            temperature=0.7,
-            top_p=0.8,
-            top_k=40,
-            max_output_tokens=8192,
-        )
+        # Stream the reply so output shows up as it is generated
+        response = model.generate_content(prompt, generation_config=OUTLINE_GENERATION_CONFIG, stream=True)
         
-        response = model.generate_content(prompt, generation_config=generation_config)
+        parts = []
+        checked_start = False
+        for chunk in response:
+            # Closing the stream early stops generating (and paying for) the rest
+            if stop is not None and stop.is_set():
+                print("\n⚠ Outline test cancelled", file=out)
+                return False
+            if not chunk.parts:
+                continue
+            parts.append(chunk.text)
+            out.write(chunk.text)
+            out.flush()
+            
+            # The reply must be bare JSON, so anything else can be rejected
+            # as soon as its first non-whitespace character arrives
+            if not checked_start:
+                chunk_start = chunk.text.lstrip()
+                if chunk_start:
+                    checked_start = True
+                    if not chunk_start.startswith('{'):
+                        print(f"\n❌ Invalid JSON: response starts with {chunk_start[:20]!r}", file=out)
+                        return False
         
-        if response.text:
-            print(f"✅ Raw Response Length: {len(response.text)} characters")
-            print(f"📄 First 200 characters: {response.text[:200]}...")
+        response_text = ''.join(parts)
+        if response_text:
+            print(f"\n✅ Raw Response Length: {len(response_text)} characters", file=out)
             
             # Try to parse as JSON
-            import json
             try:
-                data = json.loads(response.text)
-                print(f"✅ Valid JSON with {len(data.get('chapters', []))} chapters")
-                return True
+                data = orjson.loads(response_text) if orjson is not None else json.loads(response_text)
             except json.JSONDecodeError as e:
-                print(f"❌ Invalid JSON: {str(e)}")
-                print(f"📄 Full response: {response.text}")
+                print(f"❌ Invalid JSON: {str(e)}", file=out)
                 return False
+            
+            # Stop at the first chapter the outline service would reject
+            chapters = data.get('chapters', []) if isinstance(data, dict) else []
+            for i, chapter in enumerate(chapters):
+                missing = [field for field in CHAPTER_FIELDS if not isinstance(chapter, dict) or not chapter.get(field)]
+                if missing:
+                    print(f"❌ Chapter {i + 1} missing or empty field(s): {', '.join(missing)}", file=out)
+                    return False
+            
+            print(f"✅ Valid JSON with {len(chapters)} chapters", file=out)
+            return True
         else:
-            print("❌ Empty response from API")
-            print(f"📄 Response object: {response}")
+            print("❌ Empty response from API", file=out)
+            print(f"📄 Response object: {response}", file=out)
             
             # Check if there are any safety issues or other problems
             if hasattr(response, 'prompt_feedback'):
-                print(f"📄 Prompt feedback: {response.prompt_feedback}")
+                print(f"📄 Prompt feedback: {response.prompt_feedback}", file=out)
             
             return False
             
     except Exception as e:
-        print(f"❌ Error during outline test: {str(e)}")
+        print(f"❌ Error during outline test: {str(e)}", file=out)
         return False
 
 def main():
@@ -132,13 +191,29 @@ def main():
     print("🚀 Gemini API Debug Tests")
     print("=" * 50)
     
-    # Test 1: Basic connection
-    if not test_api_connection():
+    # The tests are independent, so run the slow outline request in the
+    # background and print its buffered report once the connection test is done
+    outline_output = io.StringIO()
+    stop_outline = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        outline_future = executor.submit(test_outline_prompt, outline_output, stop_outline)
+        
+        # Test 1: Basic connection
+        connection_ok = test_api_connection()
+        if not connection_ok:
+            # The outline result would be meaningless, so abandon the request
+            # and discard its report
+            stop_outline.set()
+        
+        # Test 2: Outline prompt
+        outline_ok = outline_future.result()
+    
+    if not connection_ok:
         print("\n❌ Basic API test failed. Check your API key and connection.")
         return
     
-    # Test 2: Outline prompt
-    if not test_outline_prompt():
+    print(outline_output.getvalue(), end='')
+    if not outline_ok:
         print("\n❌ Outline generation test failed.")
         return
     
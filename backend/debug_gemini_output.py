@@ -1,18 +1,26 @@
 """
 Debug script to see raw Gemini output without any processing.
+
+Pass --cached to reuse the last response from the generation cache
+(requires REDIS_URL) instead of calling the API again.
 """
 
 import os
+import sys
 from dotenv import load_dotenv
 import google.generativeai as genai
 
 # Load environment variables
 load_dotenv()
 
+from lib.generation_cache import get_generation_cache
+
+MODEL_NAME = 'gemini-2.5-flash'
+
 # Configure Gemini
 api_key = os.getenv('GEMINI_API_KEY')
 genai.configure(api_key=api_key)
-model = genai.GenerativeModel('gemini-2.5-flash')
+model = genai.GenerativeModel(MODEL_NAME)
 
 # Simple test prompt for bullet points
 prompt = """Write a short section about keyword research with bullet points. Use markdown formatting with proper line breaks between bullet points.
@@ -24,22 +32,32 @@ Example format:
 
 Write about 3-4 bullet points about keyword research techniques."""
 
-print("Making API call to Gemini...")
-response = model.generate_content(prompt)
+use_cache = '--cached' in sys.argv
+cache = get_generation_cache()
+cache_key = cache.make_key('debug', MODEL_NAME, prompt)
+
+output = cache.get(cache_key) if use_cache else None
+if output is None:
+    print("Making API call to Gemini...")
+    output = model.generate_content(prompt).text
+    if use_cache:
+        cache.set(cache_key, output)
+else:
+    print("Using cached Gemini output (--cached)")
 
 print("\n" + "="*60)
 print("RAW GEMINI OUTPUT:")
 print("="*60)
-print(repr(response.text))  # Using repr to see exact characters including \n
+print(repr(output))  # Using repr to see exact characters including \n
 
 print("\n" + "="*60)
 print("FORMATTED OUTPUT:")
 print("="*60)
-print(response.text)
+print(output)
 
 print("\n" + "="*60)
 print("LINE BY LINE ANALYSIS:")
 print("="*60)
-lines = response.text.split('\n')
+lines = output.split('\n')
 for i, line in enumerate(lines):
     print(f"Line {i:2d}: {repr(line)}")
\ No newline at end of file
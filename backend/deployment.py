@@ -3,9 +3,13 @@ Deployment configuration and utilities for Flask Book Generator API.
 """
 
 import os
+import re
 import sys
+import hmac
 import logging
+from functools import cached_property
 from pathlib import Path
+from string import Template
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
@@ -14,6 +18,96 @@ load_dotenv()
 
 from config import get_config, Config
 
+# Environment variables every deployment needs
+REQUIRED_ENV_VARS = ('SUPABASE_URL', 'SECRET_KEY', 'GEMINI_API_KEY')
+REQUIRED_PRODUCTION_ENV_VARS = REQUIRED_ENV_VARS + ('FLASK_ENV', 'CORS_ORIGINS')
+
+# Google API keys are URL-safe tokens; also catches quotes or whitespace pasted into .env
+GEMINI_API_KEY_PATTERN = re.compile(r'[A-Za-z0-9_\-]{11,}')
+DEV_SECRET_KEY = 'dev-secret-key-change-in-production'
+
+# Shared shell deployment script; the per-environment steps are filled in below
+DEPLOYMENT_SCRIPT_TEMPLATE = Template("""#!/bin/bash
+# ${name} deployment script for Flask Book Generator API
+
+set -e  # Exit on any error
+
+${preamble}
+# Install dependencies
+echo "📦 Installing dependencies..."
+pip install -r requirements.txt
+
+# Validate configuration
+echo "🔧 Validating configuration..."
+python -c "
+from deployment import DeploymentManager
+dm = DeploymentManager()
+result = dm.validate_deployment_environment()
+${show_warnings}if not result['valid']:
+    print('❌ Configuration validation failed:')
+    for error in result['errors']:
+        print(f'  - {error}')
+    exit(1)
+print('✅ Configuration validated')
+"
+
+# ${storage_comment}
+echo "🗄️  ${storage_message}..."
+python setup_storage_bucket.py
+
+# ${start_comment}
+echo "🌟 ${start_message}..."
+${start_command}
+""")
+
+PRODUCTION_SCRIPT_PARAMS = {
+    'name': 'Production',
+    'preamble': """echo "🚀 Starting production deployment..."
+
+# Check environment variables
+echo "📋 Checking environment variables..."
+required_vars=("SUPABASE_URL" "SECRET_KEY" "GEMINI_API_KEY" "CORS_ORIGINS")
+for var in "${required_vars[@]}"; do
+    if [ -z "${!var}" ]; then
+        echo "❌ Error: $var is not set"
+        exit 1
+    fi
+done
+echo "✅ Environment variables validated"
+
+# Set production environment
+export FLASK_ENV=production
+export FLASK_DEBUG=false
+""",
+    'show_warnings': '',
+    'storage_comment': 'Run database migrations (if any)',
+    'storage_message': 'Running database setup',
+    'start_comment': 'Start the application with Gunicorn',
+    'start_message': 'Starting Flask API with Gunicorn',
+    'start_command': 'exec gunicorn -c gunicorn.conf.py app:app',
+}
+
+DEVELOPMENT_SCRIPT_PARAMS = {
+    'name': 'Development',
+    'preamble': """echo "🛠️  Starting development deployment..."
+
+# Set development environment
+export FLASK_ENV=development
+export FLASK_DEBUG=true
+export CORS_ORIGINS=http://localhost:3000
+""",
+    'show_warnings': """if result['warnings']:
+    print('⚠️  Configuration warnings:')
+    for warning in result['warnings']:
+        print(f'  - {warning}')
+""",
+    'storage_comment': 'Setup storage bucket',
+    'storage_message': 'Setting up storage bucket',
+    'start_comment': 'Start the application in development mode',
+    'start_message': 'Starting Flask API in development mode',
+    'start_command': 'python app.py',
+}
+
 
 class DeploymentManager:
     """Manages deployment configuration and validation."""
@@ -48,12 +142,8 @@ class DeploymentManager:
             validation_results['config_status']['config_validation'] = 'failed'
         
         # Check required environment variables
-        required_vars = self._get_required_env_vars()
-        missing_vars = []
-        
-        for var in required_vars:
-            if not os.getenv(var):
-                missing_vars.append(var)
+        env = os.environ
+        missing_vars = [var for var in self._get_required_env_vars() if not env.get(var)]
         
         if missing_vars:
             validation_results['valid'] = False
@@ -75,41 +165,28 @@ class DeploymentManager:
         
         return validation_results
     
-    def _get_required_env_vars(self) -> list:
-        """Get list of required environment variables."""
-        base_vars = [
-            'SUPABASE_URL',
-            'SECRET_KEY',
-            'GEMINI_API_KEY'
-        ]
-        
+    def _get_required_env_vars(self) -> tuple:
+        """Get required environment variables for the current environment."""
         if self.environment == 'production':
-            base_vars.extend([
-                'FLASK_ENV',
-                'CORS_ORIGINS'
-            ])
-        
-        return base_vars
+            return REQUIRED_PRODUCTION_ENV_VARS
+        return REQUIRED_ENV_VARS
     
     def _check_dependencies(self) -> Dict[str, str]:
         """Check external dependencies."""
         status = {}
         
-        # Check Supabase connection
+        # Check Supabase connection (reuses the process-wide storage client)
         try:
-            from lib.supabase_storage import SupabaseStorageService
-            storage = SupabaseStorageService()
+            from lib.supabase_storage import get_storage_service
+            get_storage_service()
             status['supabase_storage'] = 'passed'
         except Exception as e:
             self.logger.warning(f"Supabase storage check failed: {e}")
             status['supabase_storage'] = 'failed'
         
         # Check Gemini API key format
-        gemini_key = os.getenv('GEMINI_API_KEY')
-        if gemini_key and len(gemini_key) > 10:
-            status['gemini_api'] = 'passed'
-        else:
-            status['gemini_api'] = 'failed'
+        gemini_key = os.getenv('GEMINI_API_KEY', '')
+        status['gemini_api'] = 'passed' if GEMINI_API_KEY_PATTERN.fullmatch(gemini_key) else 'failed'
         
         return status
     
@@ -122,12 +199,11 @@ class DeploymentManager:
         if secret_key:
             if len(secret_key) < 32:
                 warnings.append("SECRET_KEY should be at least 32 characters for production")
-            if secret_key == 'dev-secret-key-change-in-production':
+            if hmac.compare_digest(secret_key.encode(), DEV_SECRET_KEY.encode()):
                 warnings.append("SECRET_KEY is using default development value")
         
-        # Check CORS origins
-        cors_origins = os.getenv('CORS_ORIGINS', '')
-        if 'localhost' in cors_origins or '127.0.0.1' in cors_origins:
+        # Check CORS origins (already split and stripped by the config)
+        if any('localhost' in origin or '127.0.0.1' in origin for origin in self.config.CORS_ORIGINS):
             warnings.append("CORS_ORIGINS contains localhost - ensure this is intended for production")
         
         # Check debug mode
@@ -136,8 +212,9 @@ class DeploymentManager:
         
         return warnings
     
-    def get_deployment_info(self) -> Dict[str, Any]:
-        """Get comprehensive deployment information."""
+    @cached_property
+    def deployment_info(self) -> Dict[str, Any]:
+        """Comprehensive deployment information (fixed for the process lifetime)."""
         return {
             'environment': self.environment,
             'app_version': os.getenv('APP_VERSION', 'unknown'),
@@ -171,105 +248,30 @@ class DeploymentManager:
             Deployment script content
         """
         if target_env == 'production':
-            return self._create_production_script()
+            return DEPLOYMENT_SCRIPT_TEMPLATE.substitute(PRODUCTION_SCRIPT_PARAMS)
         else:
-            return self._create_development_script()
-    
-    def _create_production_script(self) -> str:
-        """Create production deployment script."""
-        return """#!/bin/bash
-# Production deployment script for Flask Book Generator API
-
-set -e  # Exit on any error
-
-echo "🚀 Starting production deployment..."
-
-# Check environment variables
-echo "📋 Checking environment variables..."
-required_vars=("SUPABASE_URL" "SECRET_KEY" "GEMINI_API_KEY" "CORS_ORIGINS")
-for var in "${required_vars[@]}"; do
-    if [ -z "${!var}" ]; then
-        echo "❌ Error: $var is not set"
-        exit 1
-    fi
-done
-echo "✅ Environment variables validated"
-
-# Set production environment
-export FLASK_ENV=production
-export FLASK_DEBUG=false
-
-# Install dependencies
-echo "📦 Installing dependencies..."
-pip install -r requirements.txt
+            return DEPLOYMENT_SCRIPT_TEMPLATE.substitute(DEVELOPMENT_SCRIPT_PARAMS)
 
-# Validate configuration
-echo "🔧 Validating configuration..."
-python -c "
-from deployment import DeploymentManager
-dm = DeploymentManager()
-result = dm.validate_deployment_environment()
-if not result['valid']:
-    print('❌ Configuration validation failed:')
-    for error in result['errors']:
-        print(f'  - {error}')
-    exit(1)
-print('✅ Configuration validated')
-"
-
-# Run database migrations (if any)
-echo "🗄️  Running database setup..."
-python setup_storage_bucket.py
-
-# Start the application with Gunicorn
-echo "🌟 Starting Flask API with Gunicorn..."
-exec gunicorn -c gunicorn.conf.py app:app
-"""
+def _write_file(path: str, content: str, mode: Optional[int] = None) -> None:
+    """
+    Write content to path as UTF-8, replacing any existing file.
     
-    def _create_development_script(self) -> str:
-        """Create development deployment script."""
-        return """#!/bin/bash
-# Development deployment script for Flask Book Generator API
-
-set -e  # Exit on any error
-
-echo "🛠️  Starting development deployment..."
-
-# Set development environment
-export FLASK_ENV=development
-export FLASK_DEBUG=true
-export CORS_ORIGINS=http://localhost:3000
-
-# Install dependencies
-echo "📦 Installing dependencies..."
-pip install -r requirements.txt
-
-# Validate configuration
-echo "🔧 Validating configuration..."
-python -c "
-from deployment import DeploymentManager
-dm = DeploymentManager()
-result = dm.validate_deployment_environment()
-if result['warnings']:
-    print('⚠️  Configuration warnings:')
-    for warning in result['warnings']:
-        print(f'  - {warning}')
-if not result['valid']:
-    print('❌ Configuration validation failed:')
-    for error in result['errors']:
-        print(f'  - {error}')
-    exit(1)
-print('✅ Configuration validated')
-"
-
-# Setup storage bucket
-echo "🗄️  Setting up storage bucket..."
-python setup_storage_bucket.py
-
-# Start the application in development mode
-echo "🌟 Starting Flask API in development mode..."
-python app.py
-"""
+    Args:
+        path: File to write
+        content: File content
+        mode: Permission bits to set, also applied to an existing file
+    """
+    data = content.encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666 if mode is None else mode)
+    try:
+        if mode is not None:
+            # The create mode is masked by the umask and ignored for existing files
+            os.fchmod(fd, mode)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 
 def create_deployment_files():
@@ -277,16 +279,10 @@ def create_deployment_files():
     dm = DeploymentManager()
     
     # Create production deployment script
-    prod_script = dm.create_deployment_script('production')
-    with open('deploy_production.sh', 'w') as f:
-        f.write(prod_script)
-    os.chmod('deploy_production.sh', 0o755)
+    _write_file('deploy_production.sh', dm.create_deployment_script('production'), 0o755)
     
     # Create development deployment script
-    dev_script = dm.create_deployment_script('development')
-    with open('deploy_development.sh', 'w') as f:
-        f.write(dev_script)
-    os.chmod('deploy_development.sh', 0o755)
+    _write_file('deploy_development.sh', dm.create_deployment_script('development'), 0o755)
     
     # Create environment template
     env_template = """# Flask Book Generator API Environment Variables
@@ -327,8 +323,7 @@ JSON_LOGGING=false
 CONTAINER_ENV=false
 """
     
-    with open('.env.template', 'w') as f:
-        f.write(env_template)
+    _write_file('.env.template', env_template)
     
     print("✅ Deployment files created:")
     print("  - deploy_production.sh")
@@ -365,7 +360,7 @@ if __name__ == '__main__':
     elif len(sys.argv) > 1 and sys.argv[1] == 'info':
         # Show deployment info
         dm = DeploymentManager()
-        info = dm.get_deployment_info()
+        info = dm.deployment_info
         
         print("Deployment Information:")
         print(f"  Environment: {info['environment']}")
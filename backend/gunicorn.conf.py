@@ -2,16 +2,48 @@
 Gunicorn configuration for Flask Book Generator API.
 """
 
+import gc
 import os
+import sys
 import multiprocessing
 
+
+def _available_cpus():
+    """Number of CPUs this process may use, honoring container CPU quotas."""
+    # cgroup v2 exposes "<quota> <period>", with quota "max" when unlimited
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return max(1, int(quota) // int(period))
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1 uses a quota of -1 when unlimited
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return max(1, quota // period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
 # Server socket
 bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
 backlog = 2048
 
 # Worker processes
-workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
-worker_class = "sync"
+workers = int(os.getenv('GUNICORN_WORKERS', _available_cpus() * 2 + 1))
+# Threads let one process serve several requests waiting on Supabase or an SSE stream
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 100
@@ -48,6 +80,12 @@ certfile = os.getenv('SSL_CERTFILE')
 def on_starting(server):
     """Called just before the master process is initialized."""
     server.log.info("Starting Flask Book Generator API server")
+    
+    try:
+        validate_config()
+    except ValueError as e:
+        server.log.error(f"Configuration error: {e}")
+        sys.exit(1)
 
 def on_reload(server):
     """Called to recycle workers during a reload via SIGHUP."""
@@ -64,6 +102,11 @@ def worker_int(worker):
 def pre_fork(server, worker):
     """Called just before a worker is forked."""
     server.log.info(f"Worker {worker.pid} is being forked")
+    
+    # The preloaded app (Gemini SDK, Supabase, ReportLab) is already imported here.
+    # Freezing it keeps the workers' garbage collector from writing to those pages,
+    # so they stay shared copy-on-write instead of being copied into every worker.
+    gc.freeze()
 
 def post_fork(server, worker):
     """Called just after a worker has been forked."""
@@ -81,13 +124,7 @@ def pre_exec(server):
     """Called just before a new master process is forked."""
     server.log.info("Forked child, re-executing")
 
-def pre_request(worker, req):
-    """Called just before a worker processes the request."""
-    worker.log.debug(f"{req.method} {req.uri}")
-
-def post_request(worker, req, environ, resp):
-    """Called after a worker processes the request."""
-    worker.log.debug(f"{req.method} {req.uri} - {resp.status}")
+# No pre_request/post_request hooks: the access log already records method, URI and status
 
 # Environment-specific configurations
 if os.getenv('FLASK_ENV') == 'development':
@@ -105,7 +142,7 @@ elif os.getenv('FLASK_ENV') == 'production':
     max_requests_jitter = 100
     
     # Use more workers in production
-    workers = max(2, multiprocessing.cpu_count())
+    workers = int(os.getenv('GUNICORN_WORKERS', max(2, _available_cpus())))
     
     # Longer timeout for book generation
     timeout = 600  # 10 minutes in production
@@ -159,26 +196,13 @@ def on_exit(server):
     except Exception as e:
         server.log.error(f"Error during cleanup: {e}")
 
-# Configuration validation
+# Configuration validation (run once by the master in on_starting)
+REQUIRED_ENV_VARS = ('SUPABASE_URL', 'SECRET_KEY', 'GEMINI_API_KEY')
+
 def validate_config():
     """Validate configuration before starting."""
-    required_env_vars = [
-        'SUPABASE_URL',
-        'SECRET_KEY',
-        'GEMINI_API_KEY'
-    ]
-    
-    missing_vars = []
-    for var in required_env_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
+    env = os.environ
+    missing_vars = [var for var in REQUIRED_ENV_VARS if not env.get(var)]
     
     if missing_vars:
         raise ValueError(f"Missing required environment variables: {missing_vars}")
-
-# Run validation on import
-try:
-    validate_config()
-except ValueError as e:
-    print(f"Configuration error: {e}")
-    exit(1)
\ No newline at end of file
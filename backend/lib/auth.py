@@ -6,11 +6,14 @@ import os
 import logging
 import time
 import hashlib
+import threading
+from collections import OrderedDict
 from functools import wraps
 from flask import request, jsonify, g
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 from supabase import create_client, Client
+import jwt
 
 # Load environment variables
 load_dotenv()
@@ -37,9 +40,11 @@ class SupabaseAuthService:
         # Create Supabase client
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
         
-        # Authentication cache
-        self._token_cache: Dict[str, Dict[str, Any]] = {}
+        # Authentication cache (LRU, entries never outlive the token itself)
+        self._token_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._cache_lock = threading.Lock()
         self._cache_duration = 300  # 5 minutes in seconds
+        self._cache_max_size = 10000
         self._cache_stats = {'hits': 0, 'misses': 0, 'cleanups': 0}
         
         self.logger.info("Supabase authentication service initialized with caching enabled")
@@ -111,8 +116,8 @@ class SupabaseAuthService:
                 'app_metadata': user_data.app_metadata
             }
             
-            # Cache the result
-            self._cache_token_result(cache_key, user_info)
+            # Cache the result until the token expires, at most _cache_duration
+            self._cache_token_result(cache_key, user_info, self._get_token_expiry(token))
             
             self.logger.debug(f"Token validated and cached for user: {user_data.id}")
             return user_info
@@ -123,28 +128,55 @@ class SupabaseAuthService:
     
     def _get_cache_key(self, token: str) -> str:
         """Generate cache key from token."""
-        return hashlib.sha256(token.encode()).hexdigest()[:16]
+        return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
     
-    def _get_cached_token(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get cached token validation result if still valid."""
-        if cache_key not in self._token_cache:
-            return None
-        
-        cached_entry = self._token_cache[cache_key]
+    def _get_token_expiry(self, token: str) -> Optional[float]:
+        """
+        Read the exp claim of a token Supabase has already verified.
         
-        # Check if cache entry has expired
-        if time.time() - cached_entry['timestamp'] > self._cache_duration:
-            del self._token_cache[cache_key]
+        Args:
+            token: JWT token string
+            
+        Returns:
+            Expiry as a Unix timestamp, or None if the token has no readable exp claim
+        """
+        try:
+            exp = jwt.decode(token, options={'verify_signature': False}).get('exp')
+            return float(exp) if exp is not None else None
+        except Exception:
             return None
-        
-        return cached_entry['user_info']
     
-    def _cache_token_result(self, cache_key: str, user_info: Dict[str, Any]) -> None:
+    def _get_cached_token(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get cached token validation result if still valid."""
+        with self._cache_lock:
+            cached_entry = self._token_cache.get(cache_key)
+            if cached_entry is None:
+                return None
+            
+            # Check if cache entry has expired
+            if time.time() > cached_entry['expires_at']:
+                del self._token_cache[cache_key]
+                return None
+            
+            self._token_cache.move_to_end(cache_key)
+            return cached_entry['user_info']
+    
+    def _cache_token_result(self, cache_key: str, user_info: Dict[str, Any], token_expiry: Optional[float] = None) -> None:
         """Cache token validation result."""
-        self._token_cache[cache_key] = {
-            'user_info': user_info,
-            'timestamp': time.time()
-        }
+        expires_at = time.time() + self._cache_duration
+        if token_expiry is not None:
+            expires_at = min(expires_at, token_expiry)
+        
+        with self._cache_lock:
+            self._token_cache[cache_key] = {
+                'user_info': user_info,
+                'expires_at': expires_at
+            }
+            self._token_cache.move_to_end(cache_key)
+            
+            # Evict least recently used entries beyond the size limit
+            while len(self._token_cache) > self._cache_max_size:
+                self._token_cache.popitem(last=False)
         
         # Periodically clean up expired entries
         if len(self._token_cache) % 50 == 0:
@@ -153,14 +185,15 @@ class SupabaseAuthService:
     def _cleanup_expired_cache(self) -> None:
         """Remove expired entries from cache."""
         current_time = time.time()
-        expired_keys = []
         
-        for cache_key, entry in self._token_cache.items():
-            if current_time - entry['timestamp'] > self._cache_duration:
-                expired_keys.append(cache_key)
-        
-        for key in expired_keys:
-            del self._token_cache[key]
+        with self._cache_lock:
+            expired_keys = [
+                cache_key for cache_key, entry in self._token_cache.items()
+                if current_time > entry['expires_at']
+            ]
+            
+            for key in expired_keys:
+                del self._token_cache[key]
         
         if expired_keys:
             self._cache_stats['cleanups'] += 1
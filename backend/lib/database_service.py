@@ -3,9 +3,17 @@ Centralized database service for consistent Supabase operations.
 """
 
 import os
+import time
+import hashlib
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 from supabase import create_client, Client
+try:
+    from supabase.lib.client_options import SyncClientOptions as ClientOptions
+except ImportError:  # supabase releases before the sync/async split
+    from supabase.lib.client_options import ClientOptions
 from utils.datetime_utils import format_for_database
 
 
@@ -31,17 +39,30 @@ class DatabaseService:
         if not self.supabase_key:
             raise ValueError("SUPABASE_KEY environment variable is required")
         
+        # Fail fast on a stalled PostgREST request instead of waiting out postgrest's 120s default
+        self.request_timeout = float(os.getenv('SUPABASE_DB_TIMEOUT', '10'))
+        
         # Create client instances
         self._client = None
         self._service_client = None
         
-        self.logger.info("Database service initialized")
+        # Authenticated clients are reused per token so their HTTP connections stay open
+        self._auth_clients: OrderedDict[str, Tuple[Client, float]] = OrderedDict()
+        self._auth_clients_lock = threading.Lock()
+        self._auth_client_ttl = 300  # 5 minutes in seconds
+        self._auth_client_max = 128
+        
+        self.logger.info(f"Database service initialized (request timeout {self.request_timeout}s)")
+    
+    def _create_client(self, key: str) -> Client:
+        """Create a Supabase client using the service's request timeout."""
+        return create_client(self.supabase_url, key, options=ClientOptions(postgrest_client_timeout=self.request_timeout))
     
     @property
     def client(self) -> Client:
         """Get regular Supabase client (anon key)."""
         if self._client is None:
-            self._client = create_client(self.supabase_url, self.supabase_key)
+            self._client = self._create_client(self.supabase_key)
         return self._client
     
     @property
@@ -50,7 +71,7 @@ class DatabaseService:
         if self._service_client is None:
             if not self.supabase_service_key:
                 raise ValueError("SECRET_KEY (service role key) environment variable is required for admin operations")
-            self._service_client = create_client(self.supabase_url, self.supabase_service_key)
+            self._service_client = self._create_client(self.supabase_service_key)
         return self._service_client
     
     def get_authenticated_client(self, jwt_token: str) -> Client:
@@ -63,9 +84,27 @@ class DatabaseService:
         Returns:
             Client: Authenticated Supabase client
         """
-        client = create_client(self.supabase_url, self.supabase_key)
+        cache_key = hashlib.blake2b(jwt_token.encode(), digest_size=16).hexdigest()
+        now = time.monotonic()
+        
+        with self._auth_clients_lock:
+            cached = self._auth_clients.get(cache_key)
+            if cached is not None and now - cached[1] < self._auth_client_ttl:
+                self._auth_clients.move_to_end(cache_key)
+                return cached[0]
+        
+        client = self._create_client(self.supabase_key)
         # Set the session with JWT token
         client.auth.set_session(jwt_token, jwt_token)
+        
+        with self._auth_clients_lock:
+            self._auth_clients[cache_key] = (client, now)
+            self._auth_clients.move_to_end(cache_key)
+            
+            # Evict least recently used clients beyond the size limit
+            while len(self._auth_clients) > self._auth_client_max:
+                self._auth_clients.popitem(last=False)
+        
         return client
     
     # Books table operations
@@ -347,6 +386,59 @@ class DatabaseService:
             self.logger.error(f"Error deleting book {book_id}: {str(e)}")
             raise DatabaseError(f"Failed to delete book: {str(e)}")
     
+    def delete_book_if_exists(self, book_id: str, user_id: str) -> bool:
+        """
+        Delete a book record if it exists for the user, in a single round-trip.
+        
+        Only the number of deleted rows is returned by the server, not the row itself.
+        
+        Args:
+            book_id: Book ID
+            user_id: User ID
+            
+        Returns:
+            bool: True if a record was deleted, False if none matched
+            
+        Raises:
+            DatabaseError: If the delete fails
+        """
+        try:
+            result = self.client.table('books').delete(count='exact', returning='minimal').eq('id', book_id).eq('user_id', user_id).execute()
+            
+            if not result.count:
+                return False
+            
+            self.logger.info(f"Deleted book {book_id}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error deleting book {book_id}: {str(e)}")
+            raise DatabaseError(f"Failed to delete book: {str(e)}")
+    
+    def book_exists(self, book_id: str, user_id: str) -> bool:
+        """
+        Check whether a book record exists for the user.
+        
+        Sent as a HEAD request, so only the row count comes back.
+        
+        Args:
+            book_id: Book ID
+            user_id: User ID
+            
+        Returns:
+            bool: True if the user has a record with this ID
+            
+        Raises:
+            DatabaseError: If the query fails
+        """
+        try:
+            result = self.client.table('books').select('id', count='exact', head=True).eq('id', book_id).eq('user_id', user_id).execute()
+            return bool(result.count)
+            
+        except Exception as e:
+            self.logger.error(f"Error checking book {book_id}: {str(e)}")
+            raise DatabaseError(f"Failed to check book: {str(e)}")
+    
     def get_user_books(self, user_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get all books for a user.
@@ -563,6 +655,31 @@ class DatabaseService:
             self.logger.error(f"Error updating profile for {user_id}: {str(e)}")
             raise DatabaseError(f"Failed to update profile: {str(e)}")
     
+    def increment_profile_book_counts(self, user_id: str) -> Dict[str, Any]:
+        """
+        Atomically add one book to a user's total and daily counts.
+        
+        Requires the increment_book_counts() function from db_schema/increment_book_counts.sql.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dict: Updated profile record
+        """
+        try:
+            result = self.service_client.rpc('increment_book_counts', {'p_user_id': user_id}).execute()
+            
+            if not result.data:
+                raise DatabaseError("Profile not found")
+            
+            self.logger.info(f"Incremented book counts for user: {user_id}")
+            return result.data[0]
+            
+        except Exception as e:
+            self.logger.error(f"Error incrementing book counts for {user_id}: {str(e)}")
+            raise DatabaseError(f"Failed to increment book counts: {str(e)}")
+    
     def create_profile_with_jwt(self, profile_data: Dict[str, Any], jwt_token: str) -> Dict[str, Any]:
         """
         Create user profile using JWT-authenticated client.
@@ -0,0 +1,89 @@
+"""
+Redis-backed cache for reusable Gemini generation results.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Optional, Any
+
+from lib.redis_client import get_redis_client
+
+
+class GenerationCache:
+    """Cache for Gemini responses (e.g. outlines) keyed by normalized inputs."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+        # Cached results expire after this many days (0 disables the cache)
+        self.ttl_seconds = int(os.getenv('GENERATION_CACHE_TTL_DAYS', '7')) * 86400
+
+        self._redis = get_redis_client() if self.ttl_seconds > 0 else None
+
+        if self._redis is None:
+            self.logger.info("Generation cache disabled (requires REDIS_URL)")
+
+    @staticmethod
+    def make_key(namespace: str, *parts: str) -> str:
+        """
+        Build a cache key from case- and whitespace-normalized inputs.
+
+        Args:
+            namespace: Key namespace (e.g. 'outline')
+            *parts: Input values identifying the result
+
+        Returns:
+            str: Cache key
+        """
+        normalized = '\x1f'.join(' '.join(str(part).split()).lower() for part in parts)
+        return f"cache:{namespace}:{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached result.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached JSON value, or None on a miss
+        """
+        if self._redis is None:
+            return None
+
+        try:
+            raw = self._redis.get(key)
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            self.logger.warning(f"Generation cache read failed for {key}: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a result in the cache.
+
+        Args:
+            key: Cache key from make_key()
+            value: JSON-serializable result
+        """
+        if self._redis is None:
+            return
+
+        try:
+            self._redis.setex(key, self.ttl_seconds, json.dumps(value))
+        except Exception as e:
+            self.logger.warning(f"Generation cache write failed for {key}: {str(e)}")
+
+
+# Global instance
+_generation_cache = None
+
+
+def get_generation_cache() -> GenerationCache:
+    """Get global generation cache instance."""
+    global _generation_cache
+    if _generation_cache is None:
+        _generation_cache = GenerationCache()
+    return _generation_cache
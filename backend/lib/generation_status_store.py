@@ -0,0 +1,281 @@
+"""
+Shared store for in-flight book generation status.
+"""
+
+import os
+import json
+import heapq
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+from lib.redis_client import get_redis_client
+
+
+# Only update hashes that still exist, so late progress updates cannot
+# resurrect a partial status record after its TTL has expired. Watchers are
+# notified on the book's event channel in the same round-trip.
+_UPDATE_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], unpack(ARGV))
+    redis.call('PUBLISH', KEYS[2], '1')
+    return 1
+end
+return 0
+"""
+
+# Number of lock stripes guarding the in-process fallback (must be a power of two)
+_LOCK_STRIPES = 16
+
+
+class GenerationStatusStore:
+    """Store for book generation status shared across web and worker processes."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+        # Status entries expire after this many hours
+        self.max_age_hours = int(os.getenv('GENERATION_STATUS_TTL_HOURS', '24'))
+
+        # Use Redis hashes when available, in-process dict otherwise
+        self._redis = get_redis_client()
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        
+        # Min-heap of (creation time, book_id) so cleanup only visits expired entries
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._expiry_lock = threading.Lock()
+        self._update_script = None
+
+        if self._redis is not None:
+            self._update_script = self._redis.register_script(_UPDATE_IF_EXISTS_SCRIPT)
+            self.logger.info("Generation status store using Redis")
+        else:
+            self.logger.warning("Generation status store using in-process memory (not shared between workers)")
+
+    @property
+    def is_shared(self) -> bool:
+        """Whether status is visible to every web and worker process."""
+        return self._redis is not None
+
+    def _key(self, book_id: str) -> str:
+        """Get Redis key for a book's status hash."""
+        return f"book:{book_id}"
+
+    def _channel(self, book_id: str) -> str:
+        """Get Redis pub/sub channel announcing a book's status changes."""
+        return f"book:events:{book_id}"
+
+    def _lock(self, book_id: str) -> threading.Lock:
+        """Get the lock stripe guarding a book's in-memory status."""
+        return self._locks[hash(book_id) & (_LOCK_STRIPES - 1)]
+
+    def create(self, book_id: str, status: Dict[str, Any]) -> None:
+        """
+        Create the status record for a new generation.
+
+        Args:
+            book_id: Book ID
+            status: Initial status fields
+        """
+        if self._redis is not None:
+            key = self._key(book_id)
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.hset(key, mapping={field: json.dumps(value) for field, value in status.items()})
+            pipe.expire(key, self.max_age_hours * 3600)
+            pipe.execute()
+            return
+
+        with self._lock(book_id):
+            self._memory[book_id] = dict(status)
+        with self._expiry_lock:
+            heapq.heappush(self._expiry_heap, (time.monotonic(), book_id))
+
+        # Periodically evict old entries (Redis handles this with TTLs)
+        if len(self._memory) % 50 == 0:
+            self.cleanup()
+
+    def update(self, book_id: str, fields: Dict[str, Any]) -> bool:
+        """
+        Update fields of an existing status record.
+
+        Args:
+            book_id: Book ID
+            fields: Changed status fields
+
+        Returns:
+            bool: True if the record exists and was updated
+        """
+        if self._redis is not None:
+            args = []
+            for field, value in fields.items():
+                args.extend((field, json.dumps(value)))
+            try:
+                return bool(self._update_script(keys=[self._key(book_id), self._channel(book_id)], args=args))
+            except Exception as e:
+                self.logger.warning(f"Failed to update generation status for {book_id}: {str(e)}")
+                return False
+
+        with self._lock(book_id):
+            status = self._memory.get(book_id)
+            if status is None:
+                return False
+            status.update(fields)
+            return True
+
+    def get(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status record for a book.
+
+        Args:
+            book_id: Book ID
+
+        Returns:
+            Dict or None: Status record if the generation is tracked
+        """
+        if self._redis is not None:
+            try:
+                raw = self._redis.hgetall(self._key(book_id))
+            except Exception as e:
+                self.logger.warning(f"Failed to read generation status for {book_id}: {str(e)}")
+                return None
+            if not raw:
+                return None
+            return {field.decode(): json.loads(value) for field, value in raw.items()}
+
+        # Snapshot under the lock so callers never see a half-applied update
+        with self._lock(book_id):
+            status = self._memory.get(book_id)
+            return dict(status) if status is not None else None
+
+    def remember_missing(self, book_id: str, owner_id: str, ttl_seconds: int = 2) -> None:
+        """
+        Briefly remember that a book does not exist for a requester.
+
+        Absorbs polling storms for unknown book IDs. Only available with Redis.
+
+        Args:
+            book_id: Book ID
+            owner_id: User or anonymous user ID that looked the book up
+            ttl_seconds: How long to remember the miss
+        """
+        if self._redis is None:
+            return
+
+        try:
+            self._redis.setex(f"book:missing:{book_id}:{owner_id}", ttl_seconds, 1)
+        except Exception as e:
+            self.logger.warning(f"Failed to record missing book {book_id}: {str(e)}")
+
+    def is_known_missing(self, book_id: str, owner_id: str) -> bool:
+        """
+        Check whether a book was recently found not to exist for a requester.
+
+        Args:
+            book_id: Book ID
+            owner_id: User or anonymous user ID looking the book up
+
+        Returns:
+            bool: True if remember_missing() was called within its TTL
+        """
+        if self._redis is None:
+            return False
+
+        try:
+            return bool(self._redis.exists(f"book:missing:{book_id}:{owner_id}"))
+        except Exception as e:
+            self.logger.warning(f"Failed to check missing book {book_id}: {str(e)}")
+            return False
+
+    def watch(self, book_id: str, keepalive_interval: float = 15.0, poll_interval: float = 1.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Follow a book's status as it changes.
+
+        Yields the current record first, then the record after every update.
+        Yields None when nothing changed for keepalive_interval seconds, and
+        stops once the record no longer exists.
+
+        Args:
+            book_id: Book ID
+            keepalive_interval: Seconds between keep-alive ticks (Redis backend)
+            poll_interval: Seconds between polls (in-process fallback)
+
+        Yields:
+            Dict or None: Status record, or None as a keep-alive tick
+        """
+        if self._redis is not None:
+            # Subscribe before the first read so no update is missed in between
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self._channel(book_id))
+            try:
+                status = self.get(book_id)
+                while status is not None:
+                    yield status
+                    while pubsub.get_message(timeout=keepalive_interval) is None:
+                        yield None
+                    status = self.get(book_id)
+            finally:
+                pubsub.close()
+            return
+
+        last_seen = None
+        idle_time = 0.0
+        while True:
+            status = self.get(book_id)
+            if status is None:
+                return
+            if status.get('updated_at_ns') != last_seen:
+                last_seen = status.get('updated_at_ns')
+                idle_time = 0.0
+                yield status
+            elif idle_time >= keepalive_interval:
+                idle_time = 0.0
+                yield None
+            time.sleep(poll_interval)
+            idle_time += poll_interval
+
+    def cleanup(self, max_age_hours: Optional[int] = None) -> int:
+        """
+        Clean up old in-memory status entries.
+
+        Redis entries expire on their own, so this only affects the in-process fallback.
+
+        Args:
+            max_age_hours: Maximum age in hours before cleanup
+
+        Returns:
+            int: Number of entries removed
+        """
+        if self._redis is not None:
+            return 0
+
+        if max_age_hours is None:
+            max_age_hours = self.max_age_hours
+        cutoff_time = time.monotonic() - max_age_hours * 3600
+
+        old_entries = []
+        with self._expiry_lock:
+            while self._expiry_heap and self._expiry_heap[0][0] < cutoff_time:
+                old_entries.append(heapq.heappop(self._expiry_heap)[1])
+
+        for book_id in old_entries:
+            with self._lock(book_id):
+                self._memory.pop(book_id, None)
+
+        if old_entries:
+            self.logger.info(f"Cleaned up {len(old_entries)} old generation status entries")
+
+        return len(old_entries)
+
+
+# Global instance
+_status_store = None
+
+
+def get_generation_status_store() -> GenerationStatusStore:
+    """Get global generation status store instance."""
+    global _status_store
+    if _status_store is None:
+        _status_store = GenerationStatusStore()
+    return _status_store
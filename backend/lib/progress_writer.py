@@ -0,0 +1,90 @@
+"""
+Background writer that coalesces book progress updates before they reach the database.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+
+
+class ProgressWriter:
+    """
+    Writes book row updates from a background thread, keeping only the latest per book.
+
+    Progress updates are queued with submit() and written at most every
+    flush_interval seconds, so the generation job never waits on the database
+    for them. Terminal updates use write_now(), which discards anything still
+    queued for the book and is ordered after any write already in flight.
+    """
+
+    def __init__(self, write_func: Callable[[str, Dict[str, Any]], None], flush_interval: float = 0.25):
+        """
+        Args:
+            write_func: Function writing a dict of fields to a book's row
+            flush_interval: Seconds to collect updates before writing them
+        """
+        self.logger = logging.getLogger(__name__)
+        self.flush_interval = flush_interval
+
+        self._write_func = write_func
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_cond = threading.Condition()
+
+        # Held for the duration of every database write to keep writes per book ordered
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, book_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Queue fields for a book's row, merging them into any update not yet written.
+
+        Args:
+            book_id: Book ID
+            fields: Changed columns
+        """
+        with self._pending_cond:
+            self._pending.setdefault(book_id, {}).update(fields)
+
+            # Threads do not survive fork (e.g. RQ work horses), so start lazily per process
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='progress-writer', daemon=True)
+                self._thread.start()
+
+            self._pending_cond.notify()
+
+    def write_now(self, book_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Write fields for a book's row immediately, superseding queued updates.
+
+        Args:
+            book_id: Book ID
+            fields: Changed columns
+
+        Raises:
+            Exception: Whatever write_func raises
+        """
+        with self._write_lock:
+            with self._pending_cond:
+                self._pending.pop(book_id, None)
+            self._write_func(book_id, fields)
+
+    def _run(self) -> None:
+        """Write queued updates until the process exits."""
+        while True:
+            with self._pending_cond:
+                while not self._pending:
+                    self._pending_cond.wait()
+
+            # Let rapid updates for the same book coalesce
+            time.sleep(self.flush_interval)
+
+            with self._write_lock:
+                with self._pending_cond:
+                    batch, self._pending = self._pending, {}
+
+                for book_id, fields in batch.items():
+                    try:
+                        self._write_func(book_id, fields)
+                    except Exception as e:
+                        self.logger.error(f"Failed to write progress for book {book_id}: {str(e)}")
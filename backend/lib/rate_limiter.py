@@ -113,7 +113,7 @@ def apply_rate_limits(limiter: Limiter):
     """
     
     # Import here to avoid circular imports
-    from api.book_generation import generate_book, get_book_status
+    from api.book_generation import generate_book, get_book_status, stream_book_status
     from api.file_management import get_book_files, delete_book
     
     # Book generation endpoints (most restrictive)
@@ -124,6 +124,9 @@ def apply_rate_limits(limiter: Limiter):
     limiter.limit("200 per hour")(get_book_status)
     limiter.limit("20 per minute")(get_book_status)
     
+    # Status streams (one long-lived connection replaces many polls)
+    limiter.limit("30 per hour")(stream_book_status)
+    
     # File access
     limiter.limit(RateLimitConfig.FILE_ACCESS_LIMIT)(get_book_files)
     limiter.limit(RateLimitConfig.FILE_ACCESS_BURST_LIMIT)(get_book_files)
@@ -0,0 +1,45 @@
+"""
+Shared Redis connection pool for cross-process state.
+"""
+
+import os
+import logging
+from typing import Optional
+
+try:
+    from redis import Redis, ConnectionPool
+except ImportError:  # Redis is optional in development
+    Redis = None
+    ConnectionPool = None
+
+
+logger = logging.getLogger(__name__)
+
+# Global instance
+_redis_client = None
+_redis_initialized = False
+
+
+def get_redis_client() -> Optional['Redis']:
+    """
+    Get global Redis client backed by a shared connection pool.
+
+    Returns:
+        Redis client, or None if REDIS_URL is not configured
+    """
+    global _redis_client, _redis_initialized
+    if not _redis_initialized:
+        redis_url = os.getenv('REDIS_URL')
+
+        if redis_url and Redis is not None:
+            pool = ConnectionPool.from_url(
+                redis_url,
+                max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', '50'))
+            )
+            _redis_client = Redis(connection_pool=pool)
+            logger.info(f"Redis connection pool initialized: {redis_url.split('@')[-1]}")  # Hide credentials
+        else:
+            logger.warning("Redis is not configured; using in-process state (not suitable for production)")
+
+        _redis_initialized = True
+    return _redis_client
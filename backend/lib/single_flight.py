@@ -0,0 +1,179 @@
+"""
+Redis-backed single-flight guard for deduplicating identical background jobs.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Optional, Dict, Any, Tuple
+
+from lib.redis_client import get_redis_client
+
+
+# Publish the result and release the lock only while this job still owns it,
+# so a job whose lock expired cannot release a lock another job now holds
+_PUBLISH_IF_OWNER_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('LPUSH', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+# Attempts at taking a lock that disappears between SET NX and GET
+_ACQUIRE_ATTEMPTS = 3
+
+
+class SingleFlight:
+    """Lets one job compute a result while identical jobs wait for it."""
+
+    def __init__(self, redis_client=None):
+        """
+        Args:
+            redis_client: Redis client to coordinate through (defaults to the shared client)
+        """
+        self.logger = logging.getLogger(__name__)
+
+        # Lock lifetime guards against owners that die without publishing
+        self.lock_ttl = int(os.getenv('SINGLE_FLIGHT_LOCK_TTL', '3600'))
+        self.result_ttl = 600
+
+        self._redis = redis_client if redis_client is not None else get_redis_client()
+        self._publish_script = None
+        if self._redis is not None:
+            self._publish_script = self._redis.register_script(_PUBLISH_IF_OWNER_SCRIPT)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether deduplication is available (requires Redis)."""
+        return self._redis is not None
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """
+        Build a flight key from the exact inputs.
+
+        Inputs are not normalized: waiters receive copies of the owner's files,
+        which carry the owner's title and author verbatim.
+
+        Args:
+            *parts: Input values identifying the job
+
+        Returns:
+            str: Flight key
+        """
+        joined = '\x1f'.join(str(part) for part in parts)
+        return hashlib.sha256(joined.encode('utf-8')).hexdigest()
+
+    def acquire(self, key: str, owner_id: str) -> Tuple[bool, Optional[str]]:
+        """
+        Try to become the owner of a flight.
+
+        Args:
+            key: Flight key from make_key()
+            owner_id: ID of the job trying to acquire the flight
+
+        Returns:
+            Tuple of (acquired, owner): acquired is True only if this job now
+            holds the flight and must publish() when done; otherwise owner is
+            the ID of the job that holds it, or None if the job should run
+            without deduplication (Redis unavailable or failing)
+        """
+        if self._redis is None:
+            return False, None
+
+        lock_key = f"book:sf:{key}"
+        try:
+            for _ in range(_ACQUIRE_ATTEMPTS):
+                if self._redis.set(lock_key, owner_id, nx=True, ex=self.lock_ttl):
+                    # Drop any result left over from a previous flight
+                    self._redis.delete(f"book:sf:done:{key}")
+                    return True, None
+
+                owner = self._redis.get(lock_key)
+                if owner:
+                    return False, owner.decode()
+                # The lock was released in between; try to take it again
+
+        except Exception as e:
+            self.logger.warning(f"Single-flight acquire failed for {owner_id}: {str(e)}")
+
+        return False, None
+
+    def wait(self, key: str, timeout: int) -> Optional[Dict[str, Any]]:
+        """
+        Block until the owner publishes its result.
+
+        Args:
+            key: Flight key from make_key()
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Dict or None: Published result, or None on timeout
+        """
+        if self._redis is None:
+            return None
+
+        done_key = f"book:sf:done:{key}"
+        try:
+            item = self._redis.brpop(done_key, timeout=timeout)
+            if item is None:
+                return None
+
+            # Pass the result on to the next waiter
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.lpush(done_key, item[1])
+            pipe.expire(done_key, self.result_ttl)
+            pipe.execute()
+
+            return json.loads(item[1])
+
+        except Exception as e:
+            self.logger.warning(f"Single-flight wait failed: {str(e)}")
+            return None
+
+    def publish(self, key: str, owner_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Publish the owner's result and release the flight.
+
+        Does nothing if the flight is no longer held by owner_id (e.g. the
+        lock expired and another job acquired it).
+
+        Args:
+            key: Flight key from make_key()
+            owner_id: ID of the job that acquired the flight
+            result: JSON-serializable result for waiting jobs
+
+        Returns:
+            bool: True if the result was published
+        """
+        if self._redis is None:
+            return False
+
+        try:
+            published = bool(self._publish_script(
+                keys=[f"book:sf:{key}", f"book:sf:done:{key}"],
+                args=[owner_id, json.dumps(result), self.result_ttl]
+            ))
+        except Exception as e:
+            self.logger.warning(f"Single-flight publish failed: {str(e)}")
+            return False
+
+        if not published:
+            self.logger.warning(f"Single-flight lock for {owner_id} was lost before publishing")
+        return published
+
+
+# Global instance
+_single_flight = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get global single-flight instance."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -3,7 +3,10 @@ Supabase Storage integration for file upload, download, and management.
 """
 
 import os
+import time
 import logging
+import threading
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 from pathlib import Path
 from supabase import create_client, Client
@@ -15,6 +18,17 @@ class SupabaseStorageError(Exception):
     pass
 
 
+# Files stored for every book, by file type
+BOOK_FILE_NAMES = {
+    'pdf': 'book.pdf',
+    'epub': 'book.epub',
+    'metadata': 'metadata.pdf'
+}
+
+# Maximum number of books whose signed URLs are kept per process
+SIGNED_URL_CACHE_MAX_SIZE = 10000
+
+
 class SupabaseStorageService:
     """Service for managing files in Supabase Storage."""
     
@@ -31,6 +45,10 @@ class SupabaseStorageService:
         try:
             self.client: Client = create_client(supabase_url, supabase_service_key)
             self.bucket_name = 'books'  # Supabase Storage bucket name
+            
+            # (user_id, book_id, expires_in) -> (monotonic expiry, file URLs)
+            self._url_cache: OrderedDict = OrderedDict()
+            self._url_cache_lock = threading.Lock()
             self.logger.info("Supabase Storage client initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize Supabase client: {str(e)}")
@@ -63,12 +81,35 @@ class SupabaseStorageService:
             with open(local_file_path, 'rb') as file:
                 file_content = file.read()
             
+        except Exception as e:
+            self.logger.error(f"Failed to upload file {local_file_path}: {str(e)}")
+            raise SupabaseStorageError(f"Upload failed: {str(e)}")
+        
+        return self.upload_bytes(file_content, storage_path)
+    
+    def upload_bytes(self, file_content: bytes, storage_path: str) -> str:
+        """
+        Upload in-memory file content to Supabase Storage.
+        
+        Args:
+            file_content: File content
+            storage_path: Path in storage (e.g., 'books/user123/book456/book.pdf')
+            
+        Returns:
+            str: Public URL of the uploaded file
+            
+        Raises:
+            SupabaseStorageError: If upload fails
+        """
+        try:
+            self.logger.info(f"Uploading {len(file_content):,} bytes to {storage_path}")
+            
             # Upload to Supabase Storage
             response = self.client.storage.from_(self.bucket_name).upload(
                 path=storage_path,
                 file=file_content,
                 file_options={
-                    "content-type": self._get_content_type(local_file_path),
+                    "content-type": self._get_content_type(storage_path),
                     "upsert": "true"  # Overwrite if exists - must be string
                 }
             )
@@ -84,7 +125,7 @@ class SupabaseStorageService:
             return public_url
             
         except Exception as e:
-            self.logger.error(f"Failed to upload file {local_file_path}: {str(e)}")
+            self.logger.error(f"Failed to upload to {storage_path}: {str(e)}")
             raise SupabaseStorageError(f"Upload failed: {str(e)}")
     
     def delete_file(self, storage_path: str) -> bool:
@@ -116,6 +157,35 @@ class SupabaseStorageService:
             self.logger.error(f"Failed to delete file {storage_path}: {str(e)}")
             raise SupabaseStorageError(f"Deletion failed: {str(e)}")
     
+    def copy_file(self, source_path: str, destination_path: str) -> str:
+        """
+        Copy a file within Supabase Storage.
+
+        Args:
+            source_path: Existing path in storage
+            destination_path: Path in storage to copy to
+
+        Returns:
+            str: Public URL of the copied file
+
+        Raises:
+            SupabaseStorageError: If copy fails
+        """
+        try:
+            self.logger.info(f"Copying file: {source_path} to {destination_path}")
+
+            response = self.client.storage.from_(self.bucket_name).copy(source_path, destination_path)
+
+            # Check for copy errors
+            if hasattr(response, 'error') and response.error:
+                raise SupabaseStorageError(f"Copy failed: {response.error}")
+
+            return self.get_public_url(destination_path)
+
+        except Exception as e:
+            self.logger.error(f"Failed to copy file {source_path}: {str(e)}")
+            raise SupabaseStorageError(f"Copy failed: {str(e)}")
+
     def get_signed_url(self, storage_path: str, expires_in: int = 3600) -> str:
         """
         Generate a signed URL for file download.
@@ -223,42 +293,55 @@ class SupabaseStorageService:
         except Exception as e:
             self.logger.warning(f"Failed to clean up temporary file {file_path}: {str(e)}")
     
-    def cleanup_book_files(self, user_id: str, book_id: str) -> bool:
+    def cleanup_book_files(self, user_id: str, book_id: str, raise_errors: bool = False) -> bool:
         """
         Clean up all files for a specific book.
         
+        Existing files are found with one listing and removed with one batch call.
+        
         Args:
             user_id: User ID
             book_id: Book ID
+            raise_errors: Raise on failure instead of returning False
             
         Returns:
             bool: True if cleanup was successful
+            
+        Raises:
+            SupabaseStorageError: If cleanup fails and raise_errors is set
         """
         try:
             self.logger.info(f"Cleaning up files for book {book_id} (user {user_id})")
+            self.invalidate_book_file_urls(user_id, book_id)
             
-            # List of standard book files
-            file_names = ['book.pdf', 'book.epub', 'metadata.pdf']
-            success_count = 0
+            file_names = list(BOOK_FILE_NAMES.values())
+            book_dir = os.path.dirname(self.generate_storage_path(user_id, book_id, file_names[0]))
             
-            for filename in file_names:
-                storage_path = self.generate_storage_path(user_id, book_id, filename)
-                
-                if self.file_exists(storage_path):
-                    try:
-                        self.delete_file(storage_path)
-                        success_count += 1
-                        self.logger.info(f"Deleted {filename} for book {book_id}")
-                    except Exception as e:
-                        self.logger.warning(f"Failed to delete {filename} for book {book_id}: {str(e)}")
-                else:
-                    self.logger.info(f"File {filename} does not exist for book {book_id}")
+            response = self.client.storage.from_(self.bucket_name).list(path=book_dir)
+            if hasattr(response, 'error') and response.error:
+                raise SupabaseStorageError(f"Listing failed: {response.error}")
+            
+            existing_names = {file.get('name') for file in response}
+            storage_paths = [
+                self.generate_storage_path(user_id, book_id, filename)
+                for filename in file_names if filename in existing_names
+            ]
+            
+            if not storage_paths:
+                self.logger.info(f"No files to clean up for book {book_id}")
+                return False
+            
+            response = self.client.storage.from_(self.bucket_name).remove(storage_paths)
+            if hasattr(response, 'error') and response.error:
+                raise SupabaseStorageError(f"Deletion failed: {response.error}")
             
-            self.logger.info(f"Cleaned up {success_count}/{len(file_names)} files for book {book_id}")
-            return success_count > 0
+            self.logger.info(f"Cleaned up {len(storage_paths)}/{len(file_names)} files for book {book_id}")
+            return True
             
         except Exception as e:
             self.logger.error(f"Failed to cleanup files for book {book_id}: {str(e)}")
+            if raise_errors:
+                raise SupabaseStorageError(f"Cleanup failed: {str(e)}")
             return False
     
     def validate_file_before_upload(self, file_path: str, max_size_mb: int = 50) -> bool:
@@ -309,6 +392,9 @@ class SupabaseStorageService:
         """
         Get signed URLs for all book files.
         
+        Complete sets of URLs are reused for half of their validity, so repeated
+        requests skip the storage round-trips and hand out the same URLs.
+        
         Args:
             user_id: User ID
             book_id: Book ID
@@ -317,14 +403,18 @@ class SupabaseStorageService:
         Returns:
             Dict with file URLs (None if file doesn't exist)
         """
+        cache_key = (user_id, book_id, expires_in)
+        with self._url_cache_lock:
+            cached = self._url_cache.get(cache_key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._url_cache.move_to_end(cache_key)
+                    return dict(cached[1])
+                del self._url_cache[cache_key]
+        
         file_urls = {}
-        file_names = {
-            'pdf': 'book.pdf',
-            'epub': 'book.epub',
-            'metadata': 'metadata.pdf'
-        }
         
-        for file_type, filename in file_names.items():
+        for file_type, filename in BOOK_FILE_NAMES.items():
             storage_path = self.generate_storage_path(user_id, book_id, filename)
             
             try:
@@ -336,8 +426,28 @@ class SupabaseStorageService:
                 self.logger.warning(f"Failed to get URL for {filename}: {str(e)}")
                 file_urls[file_type] = None
         
+        # Partial results may be for a book whose files are still being uploaded
+        if all(file_urls.values()):
+            with self._url_cache_lock:
+                self._url_cache[cache_key] = (time.monotonic() + expires_in / 2, dict(file_urls))
+                self._url_cache.move_to_end(cache_key)
+                while len(self._url_cache) > SIGNED_URL_CACHE_MAX_SIZE:
+                    self._url_cache.popitem(last=False)
+        
         return file_urls
     
+    def invalidate_book_file_urls(self, user_id: str, book_id: str) -> None:
+        """
+        Drop cached signed URLs for a book.
+        
+        Args:
+            user_id: User ID
+            book_id: Book ID
+        """
+        with self._url_cache_lock:
+            for cache_key in [key for key in self._url_cache if key[0] == user_id and key[1] == book_id]:
+                del self._url_cache[cache_key]
+    
     def _get_content_type(self, file_path: str) -> str:
         """
         Determine content type based on file extension.
@@ -395,7 +505,17 @@ class SupabaseStorageService:
             return None
 
 
-# Convenience function for easy import
+# Global instance
+_storage_service = None
+_storage_service_lock = threading.Lock()
+
+
 def get_storage_service() -> SupabaseStorageService:
-    """Get a configured Supabase Storage service instance."""
-    return SupabaseStorageService()
\ No newline at end of file
+    """Get global Supabase Storage service instance."""
+    global _storage_service
+    if _storage_service is None:
+        # Concurrent first requests would otherwise each build a client
+        with _storage_service_lock:
+            if _storage_service is None:
+                _storage_service = SupabaseStorageService()
+    return _storage_service
\ No newline at end of file
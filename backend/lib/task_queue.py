@@ -0,0 +1,115 @@
+"""
+Background task queue for long-running book generation jobs.
+"""
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from lib.redis_client import get_redis_client
+
+try:
+    from rq import Queue, Retry
+except ImportError:  # Redis Queue is optional in development
+    Queue = None
+    Retry = None
+
+
+# Multipliers for RQ-style timeout suffixes ('90s', '30m', '1h')
+_TIMEOUT_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _parse_timeout(value: str) -> int:
+    """Convert an RQ job timeout ('1800' or '30m') to seconds."""
+    value = value.strip().lower()
+    if value and value[-1] in _TIMEOUT_UNITS:
+        return int(value[:-1]) * _TIMEOUT_UNITS[value[-1]]
+    return int(value)
+
+
+class TaskQueueError(Exception):
+    """Custom exception for task queue operations."""
+    pass
+
+
+class TaskQueueService:
+    """Service for dispatching background jobs to an RQ worker pool."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+        # Queue settings
+        self.queue_name = os.getenv('BOOK_QUEUE_NAME', 'books')
+        self.job_timeout = os.getenv('BOOK_JOB_TIMEOUT', '30m')
+        self.job_timeout_seconds = _parse_timeout(self.job_timeout)
+        self.max_local_workers = int(os.getenv('BOOK_WORKERS', '4'))
+
+        # Use Redis Queue when available, a bounded in-process thread pool otherwise
+        redis_client = get_redis_client()
+        self._queue = None
+        self._executor = None
+
+        if redis_client is not None and Queue is not None:
+            self._queue = Queue(self.queue_name, connection=redis_client)
+            self.logger.info(f"Using Redis Queue '{self.queue_name}' for background jobs")
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_local_workers,
+                thread_name_prefix='book-job'
+            )
+            self.logger.warning(
+                f"Using {self.max_local_workers} in-process threads for background jobs (not suitable for production)"
+            )
+
+    @property
+    def is_distributed(self) -> bool:
+        """Whether jobs run in separate worker processes."""
+        return self._queue is not None
+
+    def enqueue(self, func: Callable, *args, job_id: Optional[str] = None, retries: int = 0) -> Optional[str]:
+        """
+        Enqueue a job for background execution.
+
+        Args:
+            func: Importable module-level function to run
+            *args: Positional arguments for the function
+            job_id: Optional job ID (e.g. the book ID)
+            retries: Times RQ re-runs a job that raised (ignored by the in-process fallback)
+
+        Returns:
+            str: Job ID of the enqueued job
+
+        Raises:
+            TaskQueueError: If the job could not be enqueued
+        """
+        try:
+            if self._queue is not None:
+                job = self._queue.enqueue(
+                    func, *args,
+                    job_id=job_id,
+                    job_timeout=self.job_timeout,
+                    retry=Retry(max=retries, interval=60) if retries else None
+                )
+                self.logger.debug(f"Enqueued job {job.id} on queue '{self.queue_name}'")
+                return job.id
+
+            # Development fallback: jobs beyond max_local_workers wait for a free thread
+            self._executor.submit(func, *args)
+            return job_id
+
+        except Exception as e:
+            self.logger.error(f"Failed to enqueue job {job_id}: {str(e)}")
+            raise TaskQueueError(f"Failed to enqueue job: {str(e)}")
+
+
+# Global instance
+_task_queue = None
+
+
+def get_task_queue() -> TaskQueueService:
+    """Get global task queue instance."""
+    global _task_queue
+    if _task_queue is None:
+        _task_queue = TaskQueueService()
+    return _task_queue
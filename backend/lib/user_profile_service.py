@@ -2,12 +2,45 @@
 User profile management service for automatic profile creation and management.
 """
 
+import json
 import logging
 from typing import Optional, Dict, Any
 from lib.database_service import get_database_service, DatabaseError
+from lib.redis_client import get_redis_client
 from utils.datetime_utils import format_for_database
 
 
+# Atomically reserve one generation against a quota counter. The counter is
+# seeded from the database count the first time it is seen, so concurrent
+# requests that all passed the database check cannot exceed the limit.
+_CONSUME_QUOTA_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+local n = redis.call('INCR', KEYS[1])
+if n > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return 0
+end
+return n
+"""
+
+# Give back a reservation made by _CONSUME_QUOTA_SCRIPT. A counter that has
+# already expired is left alone; it will be reseeded from the database.
+_RELEASE_QUOTA_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 and tonumber(redis.call('GET', KEYS[1])) > 0 then
+    return redis.call('DECR', KEYS[1])
+end
+return -1
+"""
+
+# Lifetime of a quota counter; the database count is authoritative after that
+QUOTA_COUNTER_TTL = 3600
+
+# Lifetime of a cached generation limit check
+LIMIT_CHECK_CACHE_TTL = 5
+
+
 class ProfileError(Exception):
     """Custom exception for profile operations."""
     pass
@@ -19,6 +52,14 @@ class UserProfileService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.db = get_database_service()
+        
+        # Atomic quota reservation (requires Redis)
+        self._redis = get_redis_client()
+        self._consume_quota_script = None
+        self._release_quota_script = None
+        if self._redis is not None:
+            self._consume_quota_script = self._redis.register_script(_CONSUME_QUOTA_SCRIPT)
+            self._release_quota_script = self._redis.register_script(_RELEASE_QUOTA_SCRIPT)
     
     def ensure_profile_exists(self, user_id: str, user_email: str = None, user_metadata: Dict[str, Any] = None, jwt_token: str = None) -> Dict[str, Any]:
         """
@@ -288,6 +329,55 @@ class UserProfileService:
         Returns:
             Dict: Contains 'allowed' boolean, 'remaining' count, and limit info
         """
+        # Repeat attempts within a few seconds of a denial reuse it. Only denials
+        # are cached: an allowed result's counts seed the quota counter, so they
+        # must always come from the database.
+        cache_key = self._limit_cache_key(user_id, anonymous_user_id)
+        if cache_key and self._redis is not None:
+            try:
+                cached = self._redis.get(cache_key)
+                if cached is not None:
+                    return json.loads(cached)
+            except Exception as e:
+                self.logger.warning(f"Failed to read cached generation limit: {str(e)}")
+        
+        limit_check = self._check_generation_limit(user_id, anonymous_user_id, jwt_token)
+        
+        if cache_key and self._redis is not None and not limit_check['allowed']:
+            try:
+                self._redis.setex(cache_key, LIMIT_CHECK_CACHE_TTL, json.dumps(limit_check))
+            except Exception as e:
+                self.logger.warning(f"Failed to cache generation limit: {str(e)}")
+        
+        return limit_check
+    
+    def invalidate_generation_limit(self, user_id: str = None, anonymous_user_id: str = None) -> None:
+        """
+        Drop the cached generation limit check after the user's counts change.
+        
+        Args:
+            user_id: User ID (for authenticated users)
+            anonymous_user_id: Anonymous user ID (for anonymous users)
+        """
+        cache_key = self._limit_cache_key(user_id, anonymous_user_id)
+        if not cache_key or self._redis is None:
+            return
+        
+        try:
+            self._redis.delete(cache_key)
+        except Exception as e:
+            self.logger.warning(f"Failed to invalidate cached generation limit: {str(e)}")
+    
+    def _limit_cache_key(self, user_id: str = None, anonymous_user_id: str = None) -> Optional[str]:
+        """Get Redis key for a cached generation limit check."""
+        if user_id:
+            return f"limit:user:{user_id}"
+        if anonymous_user_id:
+            return f"limit:anon:{anonymous_user_id}"
+        return None
+    
+    def _check_generation_limit(self, user_id: str = None, anonymous_user_id: str = None, jwt_token: str = None) -> Dict[str, Any]:
+        """Check generation limit against the database (see check_generation_limit)."""
         try:
             if user_id:
                 # Authenticated user - check profile-based limits
@@ -328,6 +418,8 @@ class UserProfileService:
                     'limit_type': limit_type,
                     'limit_value': limit_value,
                     'current_count': total_books if limit_type == 'lifetime' else daily_books,
+                    'total_books_generated': total_books,
+                    'books_generated_today': daily_books,
                     'subscription_status': subscription_status,
                     'user_type': 'authenticated'
                 }
@@ -355,6 +447,60 @@ class UserProfileService:
             self.logger.error(f"Error checking generation limit: {str(e)}")
             raise ProfileError(f"Failed to check generation limit: {str(e)}")
     
+    def try_consume_quota(self, limit_check: Dict[str, Any], user_id: str = None, anonymous_user_id: str = None) -> bool:
+        """
+        Atomically reserve one generation from the quota found by check_generation_limit.
+        
+        Closes the race where concurrent requests all pass the database limit check
+        before any of them records its book. Without Redis the database check stands alone.
+        
+        Args:
+            limit_check: Result of check_generation_limit()
+            user_id: User ID (for authenticated users)
+            anonymous_user_id: Anonymous user ID (for anonymous users)
+            
+        Returns:
+            bool: True if the generation may proceed
+        """
+        if self._consume_quota_script is None:
+            return limit_check['allowed']
+        
+        key = self._quota_key(limit_check, user_id, anonymous_user_id)
+        try:
+            return bool(self._consume_quota_script(
+                keys=[key],
+                args=[limit_check['limit_value'], limit_check['current_count'], QUOTA_COUNTER_TTL]
+            ))
+        except Exception as e:
+            self.logger.warning(f"Quota reservation failed for {key}: {str(e)}")
+            return limit_check['allowed']
+    
+    def release_quota(self, limit_check: Dict[str, Any], user_id: str = None, anonymous_user_id: str = None) -> None:
+        """
+        Give back a generation reserved by try_consume_quota that will not run.
+        
+        Args:
+            limit_check: Result of check_generation_limit() used for the reservation
+            user_id: User ID (for authenticated users)
+            anonymous_user_id: Anonymous user ID (for anonymous users)
+        """
+        if self._release_quota_script is None:
+            return
+        
+        key = self._quota_key(limit_check, user_id, anonymous_user_id)
+        try:
+            self._release_quota_script(keys=[key])
+        except Exception as e:
+            self.logger.warning(f"Quota release failed for {key}: {str(e)}")
+    
+    def _quota_key(self, limit_check: Dict[str, Any], user_id: str = None, anonymous_user_id: str = None) -> str:
+        """Get Redis key for a user's quota counter."""
+        owner = f"user:{user_id}" if user_id else f"anon:{anonymous_user_id}"
+        key = f"quota:{owner}:{limit_check['limit_type']}"
+        if limit_check['limit_type'] == 'daily':
+            key = f"{key}:{format_for_database()[:10]}"
+        return key
+    
     def update_subscription_status(self, user_id: str, status: str, stripe_customer_id: str = None) -> Dict[str, Any]:
         """
         Update user subscription status.
@@ -375,7 +521,9 @@ class UserProfileService:
             if stripe_customer_id:
                 updates['stripe_customer_id'] = stripe_customer_id
             
-            return self.update_profile(user_id, updates)
+            profile = self.update_profile(user_id, updates)
+            self.invalidate_generation_limit(user_id=user_id)
+            return profile
             
         except Exception as e:
             self.logger.error(f"Error updating subscription for {user_id}: {str(e)}")
@@ -439,6 +587,12 @@ class UserProfileService:
         Returns:
             Dict: Updated profile record
         """
+        # Increment server-side so concurrent generations cannot lose an update
+        try:
+            return self.db.increment_profile_book_counts(user_id)
+        except DatabaseError as e:
+            self.logger.warning(f"Atomic book count increment unavailable for {user_id}, updating profile: {str(e)}")
+        
         try:
             if jwt_token:
                 profile = self.get_profile_with_jwt(user_id, jwt_token)
@@ -12,6 +12,24 @@ from flask import request, jsonify
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import; validation runs on every generation request
+CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+UNSAFE_FILENAME_PATTERN = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+AUTHOR_DISALLOWED_PATTERN = re.compile(r"[^a-zA-Z\s\-'.]+")
+LETTER_PATTERN = re.compile(r'[a-zA-Z]')
+UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+# Spam and fake-name checks combined into one alternation each, so a value is
+# scanned once instead of once per pattern
+TITLE_SPAM_PATTERN = re.compile(
+    r'(.)\1{10,}'            # Repeated characters
+    r'|[!@#$%^&*]{5,}'       # Excessive special characters
+    r'|^\s*test\s*$',        # Just "test"
+    re.IGNORECASE
+)
+FAKE_AUTHOR_PATTERN = re.compile(r'^\s*(?:test|admin|user|anonymous)\s*$', re.IGNORECASE)
+
 
 class ValidationError(Exception):
     """Custom exception for validation errors."""
@@ -43,7 +61,7 @@ class InputSanitizer:
             return str(value)
         
         # Remove null bytes and control characters
-        value = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', value)
+        value = CONTROL_CHARS_PATTERN.sub('', value)
         
         # Strip whitespace
         value = value.strip()
@@ -73,7 +91,7 @@ class InputSanitizer:
             return ""
         
         # Remove path separators and dangerous characters
-        filename = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '', filename)
+        filename = UNSAFE_FILENAME_PATTERN.sub('', filename)
         
         # Remove leading/trailing dots and spaces
         filename = filename.strip('. ')
@@ -108,7 +126,7 @@ class InputSanitizer:
         title = InputSanitizer.sanitize_string(title, max_length=200)
         
         # Remove excessive whitespace
-        title = re.sub(r'\s+', ' ', title)
+        title = WHITESPACE_PATTERN.sub(' ', title)
         
         # Remove leading/trailing punctuation
         title = title.strip('.,;:!?-_')
@@ -133,10 +151,10 @@ class InputSanitizer:
         author = InputSanitizer.sanitize_string(author, max_length=100)
         
         # Allow only letters, spaces, hyphens, apostrophes, and periods
-        author = re.sub(r"[^a-zA-Z\s\-'.]+", '', author)
+        author = AUTHOR_DISALLOWED_PATTERN.sub('', author)
         
         # Remove excessive whitespace
-        author = re.sub(r'\s+', ' ', author)
+        author = WHITESPACE_PATTERN.sub(' ', author)
         
         # Capitalize properly
         author = ' '.join(word.capitalize() for word in author.split())
@@ -228,7 +246,7 @@ class InputValidator:
         InputValidator.validate_string_length(title, 'Book title', min_length=1, max_length=200)
         
         # Content validation
-        if not re.search(r'[a-zA-Z]', title):
+        if not LETTER_PATTERN.search(title):
             raise ValidationError(
                 'Book title must contain at least one letter',
                 'title',
@@ -236,19 +254,12 @@ class InputValidator:
             )
         
         # Prevent common spam patterns
-        spam_patterns = [
-            r'(.)\1{10,}',  # Repeated characters
-            r'[!@#$%^&*]{5,}',  # Excessive special characters
-            r'^\s*test\s*$',  # Just "test"
-        ]
-        
-        for pattern in spam_patterns:
-            if re.search(pattern, title, re.IGNORECASE):
-                raise ValidationError(
-                    'Book title contains invalid content',
-                    'title',
-                    'SPAM_DETECTED'
-                )
+        if TITLE_SPAM_PATTERN.search(title):
+            raise ValidationError(
+                'Book title contains invalid content',
+                'title',
+                'SPAM_DETECTED'
+            )
         
         return title
     
@@ -276,7 +287,7 @@ class InputValidator:
         InputValidator.validate_string_length(author, 'Author name', min_length=1, max_length=100)
         
         # Content validation - must contain at least one letter
-        if not re.search(r'[a-zA-Z]', author):
+        if not LETTER_PATTERN.search(author):
             raise ValidationError(
                 'Author name must contain at least one letter',
                 'author',
@@ -284,20 +295,12 @@ class InputValidator:
             )
         
         # Prevent obviously fake names
-        fake_patterns = [
-            r'^\s*test\s*$',
-            r'^\s*admin\s*$',
-            r'^\s*user\s*$',
-            r'^\s*anonymous\s*$',
-        ]
-        
-        for pattern in fake_patterns:
-            if re.search(pattern, author, re.IGNORECASE):
-                raise ValidationError(
-                    'Please provide a valid author name',
-                    'author',
-                    'INVALID_AUTHOR'
-                )
+        if FAKE_AUTHOR_PATTERN.search(author):
+            raise ValidationError(
+                'Please provide a valid author name',
+                'author',
+                'INVALID_AUTHOR'
+            )
         
         return author
     
@@ -346,9 +349,7 @@ class InputValidator:
         if not value:
             raise ValidationError(f"{field_name} is required", field_name, 'REQUIRED_FIELD')
         
-        uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-        
-        if not re.match(uuid_pattern, value, re.IGNORECASE):
+        if not UUID_PATTERN.match(value):
             raise ValidationError(
                 f"{field_name} must be a valid UUID",
                 field_name,
@@ -469,7 +470,8 @@ class RequestValidator:
         validated_data = {
             'title': InputValidator.validate_book_title(data['title']),
             'author': InputValidator.validate_author_name(data['author']),
-            'book_type': InputValidator.validate_book_type(data['book_type'])
+            'book_type': InputValidator.validate_book_type(data['book_type']),
+            'anonymous_user_id': data.get('anonymous_user_id')
         }
         
         return validated_data
@@ -15,7 +15,7 @@ import markdown
 from models.book_models import BookData, Chapter
 from config import Config
 from utils.validation import ValidationError
-from lib.supabase_storage import SupabaseStorageService, SupabaseStorageError
+from lib.supabase_storage import get_storage_service, SupabaseStorageError
 
 
 class EPUBGenerationError(Exception):
@@ -30,7 +30,7 @@ class EPUBGeneratorService:
         self.logger = logging.getLogger(__name__)
         
         # Initialize Supabase Storage service
-        self.storage_service = SupabaseStorageService()
+        self.storage_service = get_storage_service()
     
     def create_book_epub(self, book_data: BookData, user_id: str, book_id: str) -> str:
         """
@@ -3,6 +3,7 @@ Service for generating book marketing metadata using the Gemini API.
 """
 
 import logging
+from io import BytesIO
 from typing import Dict, Any, List
 
 from models.book_models import BookMetadata, BookData
@@ -10,7 +11,7 @@ from services.gemini_api_client import GeminiAPIClient
 from utils.validation import BookValidator, ValidationError
 from utils.datetime_utils import utc_now_iso
 from config import Config
-from lib.supabase_storage import SupabaseStorageService, SupabaseStorageError
+from lib.supabase_storage import get_storage_service, SupabaseStorageError
 
 
 class MetadataGenerationError(Exception):
@@ -27,7 +28,7 @@ class MetadataGeneratorService:
         self.validator = BookValidator()
         
         # Initialize Supabase Storage service
-        self.storage_service = SupabaseStorageService()
+        self.storage_service = get_storage_service()
     
     def generate_book_metadata(self, book_title: str, author: str, content_summary: str) -> BookMetadata:
         """
@@ -183,9 +184,6 @@ class MetadataGeneratorService:
         """
         self.logger.info(f"Creating metadata PDF document for '{book_title}'")
         
-        import tempfile
-        temp_pdf_path = None
-        
         try:
             from reportlab.lib.pagesizes import letter
             from reportlab.lib.units import inch
@@ -194,13 +192,12 @@ class MetadataGeneratorService:
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
             from reportlab.lib import colors
             
-            # Create temporary file for PDF generation
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_pdf_path = temp_file.name
+            # Render in memory; the PDF is only written to storage
+            pdf_buffer = BytesIO()
             
             # Create PDF document
             doc = SimpleDocTemplate(
-                temp_pdf_path,
+                pdf_buffer,
                 pagesize=letter,
                 rightMargin=72,
                 leftMargin=72,
@@ -331,7 +328,7 @@ class MetadataGeneratorService:
             storage_path = self.storage_service.generate_storage_path(user_id, book_id, 'metadata.pdf')
             
             # Upload to Supabase Storage
-            public_url = self.storage_service.upload_file(temp_pdf_path, storage_path)
+            public_url = self.storage_service.upload_bytes(pdf_buffer.getvalue(), storage_path)
             
             self.logger.info(f"Created and uploaded metadata PDF document: {public_url}")
             return public_url
@@ -342,10 +339,6 @@ class MetadataGeneratorService:
         except Exception as e:
             self.logger.error(f"Failed to create metadata PDF: {str(e)}")
             raise MetadataGenerationError(f"Metadata PDF creation failed: {str(e)}") from e
-        finally:
-            # Clean up temporary file
-            if temp_pdf_path:
-                self.storage_service.cleanup_temp_file(temp_pdf_path)
     
     def format_metadata_for_kdp(self, metadata: BookMetadata, book_title: str, author: str) -> Dict[str, Any]:
         """
@@ -7,6 +7,7 @@ from typing import Dict, Any, List
 from models.book_models import BookOutline, ChapterSummary
 from services.gemini_api_client import GeminiAPIClient
 from utils.validation import BookValidator, ValidationError
+from lib.generation_cache import get_generation_cache
 
 
 class OutlineGenerationError(Exception):
@@ -21,6 +22,7 @@ class OutlineGeneratorService:
         self.api_client = GeminiAPIClient()
         self.logger = logging.getLogger(__name__)
         self.validator = BookValidator()
+        self.cache = get_generation_cache()
     
     def generate_book_outline(self, book_title: str) -> BookOutline:
         """
@@ -41,6 +43,13 @@ class OutlineGeneratorService:
         
         self.logger.info(f"Starting outline generation for: {book_title}")
         
+        # Reuse a previously generated outline for the same title
+        cache_key = self.cache.make_key('outline', book_title)
+        cached_outline = self.cache.get(cache_key)
+        if cached_outline:
+            self.logger.info(f"Using cached outline for '{book_title}'")
+            return self._create_book_outline_from_data(book_title, cached_outline)
+        
         try:
             # Generate outline using API with retry logic
             outline_data = self.retry_outline_generation(book_title, max_retries=3)
@@ -51,6 +60,9 @@ class OutlineGeneratorService:
             # Validate the complete outline
             self._validate_generated_outline(book_outline)
             
+            # Only cache outlines that passed validation
+            self.cache.set(cache_key, self.export_outline_to_dict(book_outline))
+            
             self.logger.info(f"Successfully generated outline for '{book_title}' with {len(book_outline.chapters)} chapters")
             return book_outline
             
@@ -24,7 +24,7 @@ from reportlab.platypus.frames import Frame
 from models.book_models import BookData, Chapter
 from config import Config
 from utils.validation import ValidationError
-from lib.supabase_storage import SupabaseStorageService, SupabaseStorageError
+from lib.supabase_storage import get_storage_service, SupabaseStorageError
 
 
 class PDFGenerationError(Exception):
@@ -93,7 +93,7 @@ class PDFGeneratorService:
         self.logger = logging.getLogger(__name__)
         
         # Initialize Supabase Storage service
-        self.storage_service = SupabaseStorageService()
+        self.storage_service = get_storage_service()
         
         # PDF configuration from Config
         self.page_width = Config.PDF_PAGE_WIDTH * inch
@@ -126,17 +126,13 @@ class PDFGeneratorService:
         
         self.logger.info(f"Starting PDF generation for '{book_data.title}'")
         
-        import tempfile
-        temp_pdf_path = None
-        
         try:
-            # Create temporary file for PDF generation
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_pdf_path = temp_file.name
+            # Render in memory; the PDF is only written to storage
+            pdf_buffer = BytesIO()
             
             # Create PDF document
             doc = BookPDFTemplate(
-                temp_pdf_path,
+                pdf_buffer,
                 pagesize=(self.page_width, self.page_height),
                 title=book_data.title,
                 author=book_data.author
@@ -160,14 +156,16 @@ class PDFGeneratorService:
             # Build the PDF
             doc.build(story)
             
+            pdf_content = pdf_buffer.getvalue()
+            
             # Validate the generated PDF
-            self._validate_pdf_output(temp_pdf_path)
+            self._validate_pdf_content(pdf_content)
             
             # Generate storage path
             storage_path = self.storage_service.generate_storage_path(user_id, book_id, 'book.pdf')
             
             # Upload to Supabase Storage
-            public_url = self.storage_service.upload_file(temp_pdf_path, storage_path)
+            public_url = self.storage_service.upload_bytes(pdf_content, storage_path)
             
             self.logger.info(f"Successfully generated and uploaded PDF: {public_url}")
             return public_url
@@ -178,10 +176,6 @@ class PDFGeneratorService:
         except Exception as e:
             self.logger.error(f"Failed to generate PDF: {str(e)}")
             raise PDFGenerationError(f"PDF generation failed: {str(e)}") from e
-        finally:
-            # Clean up temporary file
-            if temp_pdf_path:
-                self.storage_service.cleanup_temp_file(temp_pdf_path)
     
     def _create_styles(self) -> Dict[str, ParagraphStyle]:
         """Create custom paragraph styles for the book."""
@@ -508,12 +502,12 @@ class PDFGeneratorService:
         """Generate anchor name for chapter."""
         return f"chapter_{chapter.number}"
     
-    def _validate_pdf_output(self, pdf_path: str):
-        """Validate the generated PDF file."""
-        if not os.path.exists(pdf_path):
+    def _validate_pdf_content(self, pdf_content: bytes):
+        """Validate the generated PDF content."""
+        if not pdf_content.startswith(b'%PDF'):
             raise PDFGenerationError("PDF file was not created")
         
-        file_size = os.path.getsize(pdf_path)
+        file_size = len(pdf_content)
         if file_size < 1000:  # Less than 1KB is suspicious
             raise PDFGenerationError("Generated PDF file is too small")
         
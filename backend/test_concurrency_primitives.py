@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Test script for the background progress writer, the generation status store
+and the single-flight guard.
+
+Runs against the in-process fallbacks, so no database or Redis is required.
+The single-flight handoff runs against REDIS_URL when it is set, and against
+fakeredis (pip install "fakeredis[lua]") otherwise.
+"""
+
+import sys
+import threading
+import time
+import uuid
+sys.path.append('.')
+
+try:
+    import fakeredis
+except ImportError:  # Only needed to test single-flight without a Redis server
+    fakeredis = None
+
+
+class RecordingWriter:
+    """write_func stand-in that records every row write in order."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.writes = []
+        self.lock = threading.Lock()
+        self.in_write = threading.Event()
+
+    def __call__(self, book_id, fields):
+        self.in_write.set()
+        time.sleep(self.delay)
+        with self.lock:
+            self.writes.append((book_id, dict(fields)))
+
+    def for_book(self, book_id):
+        with self.lock:
+            return [fields for written_id, fields in self.writes if written_id == book_id]
+
+
+def test_progress_writer():
+    """Test coalescing and ordering of ProgressWriter writes."""
+
+    print("1. Testing ProgressWriter...")
+
+    try:
+        from lib.progress_writer import ProgressWriter
+    except ImportError as e:
+        print(f"   ✗ Failed to import progress writer: {e}")
+        return False
+
+    # Rapid updates for one book collapse into a few writes carrying the latest values
+    recorder = RecordingWriter()
+    writer = ProgressWriter(recorder, flush_interval=0.2)
+    for progress in range(100):
+        writer.submit('book-1', {'progress': progress})
+    writer.submit('book-1', {'current_step': 'Writing chapters'})
+    time.sleep(0.6)
+
+    writes = recorder.for_book('book-1')
+    if writes and len(writes) <= 2 and writes[-1] == {'progress': 99, 'current_step': 'Writing chapters'}:
+        print(f"   ✓ 101 submits coalesced into {len(writes)} write(s) with the latest fields")
+    else:
+        print(f"   ✗ Unexpected coalesced writes: {writes}")
+        return False
+
+    # write_now discards updates still queued for the book
+    recorder = RecordingWriter()
+    writer = ProgressWriter(recorder, flush_interval=0.2)
+    writer.submit('book-2', {'progress': 50})
+    writer.write_now('book-2', {'status': 'completed'})
+    time.sleep(0.5)
+
+    writes = recorder.for_book('book-2')
+    if writes == [{'status': 'completed'}]:
+        print("   ✓ write_now superseded the queued progress update")
+    else:
+        print(f"   ✗ Queued update was written around write_now: {writes}")
+        return False
+
+    # write_now waits for a write already in flight instead of racing it
+    recorder = RecordingWriter(delay=0.3)
+    writer = ProgressWriter(recorder, flush_interval=0.05)
+    writer.submit('book-3', {'progress': 80})
+    recorder.in_write.wait(timeout=2)
+    writer.write_now('book-3', {'status': 'failed'})
+
+    writes = recorder.for_book('book-3')
+    if writes == [{'progress': 80}, {'status': 'failed'}]:
+        print("   ✓ write_now was ordered after the in-flight write")
+    else:
+        print(f"   ✗ Writes out of order: {writes}")
+        return False
+
+    # Concurrent submitters for different books each end on their own latest update
+    recorder = RecordingWriter()
+    writer = ProgressWriter(recorder, flush_interval=0.05)
+
+    def submit_all(book_id):
+        for progress in range(200):
+            writer.submit(book_id, {'progress': progress})
+
+    book_ids = [f'book-c{i}' for i in range(8)]
+    threads = [threading.Thread(target=submit_all, args=(book_id,)) for book_id in book_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    time.sleep(0.3)
+
+    for book_id in book_ids:
+        writes = recorder.for_book(book_id)
+        progresses = [fields['progress'] for fields in writes]
+        if not writes or progresses[-1] != 199 or progresses != sorted(progresses):
+            print(f"   ✗ {book_id} did not end on its latest update: {progresses}")
+            return False
+    print(f"   ✓ {len(book_ids)} concurrent submitters each ended on their latest update")
+
+    return True
+
+
+def test_generation_status_store():
+    """Test GenerationStatusStore records and in-memory expiry."""
+
+    print("\n2. Testing GenerationStatusStore...")
+
+    try:
+        from lib.generation_status_store import GenerationStatusStore
+    except ImportError as e:
+        print(f"   ✗ Failed to import generation status store: {e}")
+        return False
+
+    store = GenerationStatusStore()
+
+    # Updates only apply to existing records
+    if store.update('missing-book', {'progress': 10}):
+        print("   ✗ Update created a record that did not exist")
+        return False
+    print("   ✓ Update of an unknown book was rejected")
+
+    store.create('book-s1', {'status': 'pending', 'progress': 0})
+    store.update('book-s1', {'status': 'processing', 'progress': 40})
+    status = store.get('book-s1')
+    if status and status['status'] == 'processing' and status['progress'] == 40:
+        print("   ✓ Created record reflects the update")
+    else:
+        print(f"   ✗ Unexpected status: {status}")
+        return False
+
+    # Readers never see one field of an update without the other
+    torn_reads = []
+
+    def update_pairs():
+        for i in range(2000):
+            store.update('book-s1', {'progress': i, 'current_step': f'step {i}'})
+
+    def read_pairs():
+        for _ in range(2000):
+            status = store.get('book-s1')
+            if status['current_step'] != f"step {status['progress']}":
+                torn_reads.append(status)
+
+    store.update('book-s1', {'progress': 0, 'current_step': 'step 0'})
+    threads = [threading.Thread(target=update_pairs)] + [threading.Thread(target=read_pairs) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if torn_reads:
+        print(f"   ✗ {len(torn_reads)} read(s) saw a half-applied update, e.g. {torn_reads[0]}")
+        return False
+    print("   ✓ Concurrent readers only saw complete updates")
+
+    if store.is_shared:
+        print("   ⚠ Redis is configured; skipping in-memory expiry checks (Redis expires entries by TTL)")
+        return True
+
+    # Expired entries are evicted, newer ones are kept
+    store.create('book-s2', {'status': 'pending'})
+    time.sleep(0.01)
+    if store.cleanup(max_age_hours=24) != 0 or store.get('book-s1') is None:
+        print("   ✗ Cleanup removed entries that had not expired")
+        return False
+
+    removed = store.cleanup(max_age_hours=0)
+    if removed == 2 and store.get('book-s1') is None and store.get('book-s2') is None:
+        print("   ✓ Cleanup evicted expired entries")
+    else:
+        print(f"   ✗ Cleanup removed {removed} entries, expected 2")
+        return False
+
+    if store.update('book-s1', {'progress': 100}) or store.get('book-s1') is not None:
+        print("   ✗ Late update resurrected an expired entry")
+        return False
+    print("   ✓ Late update did not resurrect an expired entry")
+
+    return True
+
+
+def test_single_flight():
+    """Test SingleFlight acquire/wait/publish handoff."""
+
+    print("\n3. Testing SingleFlight...")
+
+    try:
+        from lib.single_flight import SingleFlight
+    except ImportError as e:
+        print(f"   ✗ Failed to import single flight: {e}")
+        return False
+
+    # Keys use the exact inputs, since waiters reuse the owner's files verbatim
+    if SingleFlight.make_key('book', 'My Title', 'Ann') == SingleFlight.make_key('book', 'my title', 'ann'):
+        print("   ✗ Keys for differently cased titles collided")
+        return False
+    print("   ✓ Keys distinguish inputs that differ only in case")
+
+    flight = SingleFlight()
+    key = SingleFlight.make_key('test', uuid.uuid4().hex)
+
+    if not flight.enabled:
+        acquired = flight.acquire(key, 'job-a')
+        if acquired != (False, None) or flight.publish(key, 'job-a', {}) or flight.wait(key, 1) is not None:
+            print(f"   ✗ Disabled flight did not let jobs run undeduplicated: {acquired}")
+            return False
+        print("   ✓ Without Redis every job runs on its own")
+
+        if fakeredis is None:
+            print("   ✗ Set REDIS_URL or install fakeredis[lua] to test the handoff")
+            return False
+        flight = SingleFlight(redis_client=fakeredis.FakeRedis())
+        print("   Using fakeredis for the handoff checks")
+
+    try:
+        if flight.acquire(key, 'job-a') != (True, None):
+            print("   ✗ First job did not acquire the flight")
+            return False
+        acquired = flight.acquire(key, 'job-b')
+        if acquired != (False, 'job-a'):
+            print(f"   ✗ Second job did not see the owner: {acquired}")
+            return False
+        print("   ✓ Second job found the owner instead of acquiring")
+
+        # Waiters block until the owner publishes, and each receives the result
+        results = []
+        waiters = [threading.Thread(target=lambda: results.append(flight.wait(key, 5))) for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        time.sleep(0.2)
+
+        if flight.publish(key, 'job-b', {'book_id': 'job-b'}):
+            print("   ✗ A job that does not own the flight published")
+            return False
+        if not flight.publish(key, 'job-a', {'book_id': 'job-a'}):
+            print("   ✗ Owner could not publish")
+            return False
+        for waiter in waiters:
+            waiter.join()
+
+        if results == [{'book_id': 'job-a'}] * 3:
+            print("   ✓ Every waiter received the owner's result")
+        else:
+            print(f"   ✗ Unexpected waiter results: {results}")
+            return False
+
+        # Publishing released the flight, so the next identical job owns a new one
+        if flight.acquire(key, 'job-c') != (True, None) or flight.wait(key, 1) is not None:
+            print("   ✗ New flight was not clean after publishing")
+            return False
+        print("   ✓ Next job acquired a fresh flight")
+
+        # An owner whose lock expired must not release the lock a new owner holds
+        flight._redis.delete(f"book:sf:{key}")
+        if flight.acquire(key, 'job-d') != (True, None):
+            print("   ✗ Job did not acquire the expired flight")
+            return False
+        if flight.publish(key, 'job-c', {'book_id': 'job-c'}):
+            print("   ✗ Owner published after losing its lock")
+            return False
+        if flight.acquire(key, 'job-e') != (False, 'job-d'):
+            print("   ✗ Stale owner released the new owner's lock")
+            return False
+        print("   ✓ Stale owner could not publish or release the new owner's lock")
+
+    finally:
+        flight._redis.delete(f"book:sf:{key}", f"book:sf:done:{key}")
+
+    return True
+
+
+def test_concurrency_primitives():
+    """Run all concurrency primitive tests."""
+
+    print("=== Concurrency Primitives Test ===\n")
+
+    if not test_progress_writer():
+        return False
+
+    if not test_generation_status_store():
+        return False
+
+    if not test_single_flight():
+        return False
+
+    print("\n=== Concurrency Primitives Test Results ===")
+    print("✓ All tests passed!")
+
+    return True
+
+if __name__ == '__main__':
+    success = test_concurrency_primitives()
+    sys.exit(0 if success else 1)
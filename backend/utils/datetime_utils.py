@@ -2,7 +2,9 @@
 Timezone-aware datetime utilities to replace deprecated datetime.utcnow().
 """
 
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
 
@@ -28,6 +30,53 @@ def utc_now_iso() -> str:
     return utc_now().isoformat()
 
 
+def utc_now_iso_seconds() -> str:
+    """
+    Get current UTC datetime as ISO string at one-second resolution.
+    
+    The string is formatted once per second, for callers (e.g. health probes)
+    that run often and don't need sub-second precision.
+    
+    Returns:
+        str: Current UTC datetime in ISO format, without microseconds
+    """
+    return _iso_from_seconds(int(time.time()))
+
+
+@lru_cache(maxsize=1)
+def _iso_from_seconds(timestamp: int) -> str:
+    """Format whole seconds since the epoch as a UTC ISO string."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def utc_now_ns() -> int:
+    """
+    Get current UTC time as integer nanoseconds since the epoch.
+    
+    Cheaper than utc_now_iso() for internal timestamps; format with iso_from_ns().
+    
+    Returns:
+        int: Current time in nanoseconds
+    """
+    return time.time_ns()
+
+
+@lru_cache(maxsize=1024)
+def iso_from_ns(timestamp_ns: int) -> str:
+    """
+    Format a nanosecond timestamp as a UTC ISO string.
+    
+    Results are cached because status polling formats the same timestamp repeatedly.
+    
+    Args:
+        timestamp_ns: Nanoseconds since the epoch (from utc_now_ns())
+        
+    Returns:
+        str: ISO formatted datetime string
+    """
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+
+
 def to_iso_string(dt: datetime) -> str:
     """
     Convert datetime to ISO string format.
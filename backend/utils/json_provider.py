@@ -0,0 +1,40 @@
+"""
+Flask JSON provider backed by orjson when it is installed.
+"""
+
+import typing as t
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib json module
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Serialize jsonify() responses with orjson.
+
+    Types orjson does not handle natively (e.g. Decimal) go through Flask's
+    default conversion. Pretty-printed debug output and installs without
+    orjson use the stdlib implementation.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        # orjson produces UTF-8 bytes, so the response body needs no re-encoding
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
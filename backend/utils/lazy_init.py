@@ -0,0 +1,39 @@
+"""
+Thread-safe lazy initialization for expensive singletons.
+"""
+
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+
+class LazyInstance(Generic[T]):
+    """
+    Construct an instance on first use, exactly once.
+    
+    Uses double-checked locking so calls after initialization never take the lock.
+    
+    Usage:
+        outline_service = LazyInstance(OutlineGeneratorService)
+        outline_service().generate_book_outline(title)
+    """
+    
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+    
+    def __call__(self) -> T:
+        """Get the instance, constructing it on first call."""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+    
+    @property
+    def initialized(self) -> bool:
+        """Whether the instance has been constructed."""
+        return self._instance is not None
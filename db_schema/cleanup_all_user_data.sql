@@ -0,0 +1,31 @@
+-- Functions used by backend/cleanup_database.py to wipe all user data in one
+-- statement and to count what is left in one round-trip.
+-- Run once in the Supabase SQL editor.
+-- DEVELOPMENT ONLY: only the service role may call them.
+
+CREATE OR REPLACE FUNCTION public.cleanup_all_user_data()
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    TRUNCATE TABLE billing_events, books, profiles RESTART IDENTITY CASCADE;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.cleanup_all_user_data() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.cleanup_all_user_data() TO service_role;
+
+CREATE OR REPLACE FUNCTION public.cleanup_counts()
+RETURNS TABLE (profiles bigint, books bigint, billing bigint)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+    SELECT
+        (SELECT count(*) FROM profiles),
+        (SELECT count(*) FROM books),
+        (SELECT count(*) FROM billing_events);
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.cleanup_counts() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.cleanup_counts() TO service_role;
@@ -0,0 +1,25 @@
+-- Function used by backend/check_schema.py to read the columns of several
+-- tables in the 'public' schema with a single RPC call.
+-- Run once in the Supabase SQL editor. Only the service role may call it, since
+-- it exposes the structure of every public table.
+
+CREATE OR REPLACE FUNCTION public.get_public_schema(tables text[])
+RETURNS TABLE (table_name text, column_name text)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        c.table_name::text,
+        c.column_name::text
+    FROM
+        information_schema.columns AS c
+    WHERE
+        c.table_schema = 'public'
+        AND c.table_name = ANY(tables)
+    ORDER BY
+        c.table_name,
+        c.ordinal_position;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.get_public_schema(text[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_public_schema(text[]) TO service_role;
@@ -0,0 +1,21 @@
+-- Function used by backend/lib/database_service.py to count a new book against
+-- a user's limits in a single statement, so concurrent generations cannot
+-- overwrite each other's increments.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION public.increment_book_counts(p_user_id uuid)
+RETURNS SETOF profiles
+LANGUAGE sql
+SET search_path = public
+AS $$
+    UPDATE profiles
+    SET total_books_generated = COALESCE(total_books_generated, 0) + 1,
+        books_generated_today = books_generated_today + 1,
+        last_generation_date = (now() AT TIME ZONE 'utc')::date,
+        updated_at = now()
+    WHERE id = p_user_id
+    RETURNING *;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.increment_book_counts(uuid) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.increment_book_counts(uuid) TO service_role;
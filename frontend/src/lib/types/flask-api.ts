@@ -72,7 +72,8 @@ export interface DeleteBookResponse extends BaseAPIResponse {
   message: string;
   details?: {
     database_deleted: boolean;
-    files_deleted: boolean;
+    files_cleanup_scheduled: boolean;
+    files_deleted?: boolean;
   };
 }
 